@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_initial'),
+        ('rentals', '0005_rental_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookedNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='bookings.booking')),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='rentals.rental')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'rental'], name='booked_night_date_rental_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import models
+
+from apps.bookings.models.booking_model import Booking
+from apps.rentals.models.rental_model import Rental
+
+
+class BookedNight(models.Model):
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='booked_nights')
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='booked_nights')
+    date = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'rental'], name='booked_night_date_rental_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.rental_id} - {self.date}"
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.bookings.models.booking_model import Booking
+from apps.bookings.utils.occupancy_utils import sync_booked_nights
+
+
+@receiver(post_save, sender=Booking)
+def update_booked_nights_on_save(sender, instance, **kwargs):
+    # Nights of deleted bookings are removed through the CASCADE foreign key
+    sync_booked_nights(instance)
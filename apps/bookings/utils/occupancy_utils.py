@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from apps.bookings.choises.booking_choice import BookingChoices
+from apps.bookings.models.booked_night_model import BookedNight
+from apps.bookings.models.booking_model import Booking
+
+
+def build_booked_nights(booking):
+    # A stay occupies the nights from start_date up to, but not including, end_date,
+    # matching the overlap check used when bookings are created and confirmed
+    nights = (booking.end_date - booking.start_date).days
+    return [
+        BookedNight(rental_id=booking.rental_id, booking_id=booking.pk, date=booking.start_date + timedelta(days=day))
+        for day in range(nights)
+    ]
+
+
+def sync_booked_nights(booking):
+    with transaction.atomic():
+        BookedNight.objects.filter(booking_id=booking.pk).delete()
+        if booking.status == BookingChoices.CONFIRMED:
+            BookedNight.objects.bulk_create(build_booked_nights(booking))
+
+
+def rebuild_booked_nights(batch_size=1000):
+    bookings_count = 0
+    with transaction.atomic():
+        BookedNight.objects.all().delete()
+        bookings = Booking.objects.filter(status=BookingChoices.CONFIRMED).only(
+            'id', 'rental_id', 'start_date', 'end_date')
+        nights = []
+        for booking in bookings.iterator(chunk_size=batch_size):
+            nights.extend(build_booked_nights(booking))
+            bookings_count += 1
+            if len(nights) >= batch_size:
+                BookedNight.objects.bulk_create(nights)
+                nights = []
+        BookedNight.objects.bulk_create(nights)
+    return bookings_count
+
+
+def filter_available(queryset, check_in, check_out):
+    """
+    Restrict rentals to those open for the whole stay and without a confirmed booking overlapping it.
+
+    @param queryset: QuerySet : Rentals to filter
+    @param check_in: date : First night of the stay
+    @param check_out: date : Departure date, the night before it is the last one
+
+    @return: QuerySet : Rentals available for the stay
+    """
+    occupied = BookedNight.objects.filter(date__gte=check_in, date__lt=check_out).values('rental_id')
+    return queryset.filter(
+        Q(availability_start_date__isnull=True) | Q(availability_start_date__lte=check_in),
+        Q(availability_end_date__isnull=True) | Q(availability_end_date__gte=check_out),
+    ).exclude(id__in=occupied)
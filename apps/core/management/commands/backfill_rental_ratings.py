@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from apps.core.utils.rating_utils import get_rating_expressions
+from apps.rentals.models.rental_model import Rental
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored average_rating and rating_score of all rentals from ratings_sum and ratings_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        max_id = Rental.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        expressions = get_rating_expressions()
+        updated = 0
+
+        # Update by primary key ranges so each statement only locks one batch of rows
+        for start in range(0, max_id, batch_size):
+            updated += Rental.objects.filter(id__gt=start, id__lte=start + batch_size).update(**expressions)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated ratings of {updated} rentals'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.search_and_filters.utils.catalog_snapshot_utils import build_catalog_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the columnar snapshot of active, verified rentals used to pre-filter searches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = build_catalog_snapshot(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Snapshot built with {count} rentals'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.rentals.utils.similarity_utils import build_similar_rentals
+
+
+class Command(BaseCommand):
+    help = 'Precompute the most similar active rentals of every active rental'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--neighbors', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = build_similar_rentals(neighbors=options['neighbors'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Similar rentals computed for {count} rentals'))
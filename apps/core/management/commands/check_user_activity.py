@@ -3,6 +3,7 @@ from django.utils import timezone
 from datetime import timedelta
 from apps.users.models.user_model import User
 from apps.rentals.models.rental_model import Rental
+from apps.search_and_filters.utils.search_cache_utils import bump_catalog_generation
 
 
 class Command(BaseCommand):
@@ -11,8 +12,14 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         three_months_ago = timezone.now() - timedelta(minutes=1)
         inactive_users = User.objects.filter(last_login__lt=three_months_ago, is_active=True, role='Landlord')
+        deactivated_count = 0
         for user in inactive_users:
             rentals = Rental.objects.filter(user=user)
             updated_count = rentals.update(status=False)
+            deactivated_count += updated_count
             user.role = 'User'
             user.save(update_fields=['role'])
+
+        # Queryset updates send no signals, cached searches are dropped once for the whole run
+        if deactivated_count:
+            bump_catalog_generation()
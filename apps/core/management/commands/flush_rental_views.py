@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.rentals.utils.view_counter_utils import flush_rental_views
+
+
+class Command(BaseCommand):
+    help = 'Write rental views counted in Redis to the rentals views count'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        flushed = flush_rental_views(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} rental views'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.search_and_filters.utils.popular_search_utils import trim_popular_searches
+from apps.search_and_filters.utils.search_history_utils import flush_search_history
+
+
+class Command(BaseCommand):
+    help = 'Write buffered search events to the search history tables and trim the popular searches tracker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        flushed = flush_search_history(batch_size=options['batch_size'])
+        trimmed = trim_popular_searches()
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} search events, trimmed {trimmed} rare queries'))
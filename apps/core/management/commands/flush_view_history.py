@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.view_history.utils.view_event_utils import flush_view_history, purge_view_events
+
+
+class Command(BaseCommand):
+    help = 'Write buffered rental view events, refresh the view rollups and purge expired view events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--retention-days', type=int, default=settings.VIEW_EVENTS_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        flushed, refreshed = flush_view_history(batch_size=options['batch_size'])
+        purged = purge_view_events(options['retention_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Flushed {flushed} view events, refreshed {refreshed} daily rollups, purged {purged} old events'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.rentals.utils.image_derivative_utils import backfill_image_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnails, medium sizes and WebP versions of rental images that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--force', action='store_true', help='Regenerate existing derivatives too')
+
+    def handle(self, *args, **options):
+        processed, failed = backfill_image_derivatives(batch_size=options['batch_size'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives of {processed} images, {failed} failed'))
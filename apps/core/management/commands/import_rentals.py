@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from apps.rentals.utils.rental_import_utils import get_import_format, import_rentals
+
+
+class Command(BaseCommand):
+    help = ('Import rentals from a CSV or JSON Lines file, reporting the rows that could not be imported. '
+            'Image paths in the file are relative to --images-dir')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='Email or username of the rentals owner')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension')
+        parser.add_argument('--images-dir', help='Defaults to RENTAL_IMPORT_IMAGES_DIR')
+        parser.add_argument('--verified', action='store_true', help='Publish the rentals without moderation')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(Q(email=options['user']) | Q(username=options['user'])).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} does not exist")
+        try:
+            file_format = get_import_format(options['path'], options['format'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as file:
+            result = import_rentals(
+                file, file_format, user, verified=options['verified'], images_dir=options['images_dir'],
+                batch_size=options['batch_size'],
+            )
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if 'error' in result:
+            self.stderr.write(result['error'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} rentals, {result['error_count']} rows failed"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.search_and_filters.utils.saved_search_utils import match_saved_searches
+
+
+class Command(BaseCommand):
+    help = 'Match rentals created, verified or edited since the previous run against all saved searches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        matched = match_saved_searches(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Found {matched} saved search matches'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.search_and_filters.utils.search_history_utils import merge_search_history_duplicates
+
+
+class Command(BaseCommand):
+    help = 'Normalize stored search queries and merge search history rows that share a normalized query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        merged = merge_search_history_duplicates(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Merged {merged} duplicate search history rows'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.rentals.models.image_rental_model import Image
+from apps.rentals.utils.image_blob_utils import acquire_image_blob
+from apps.rentals.utils.image_processing_utils import get_derivative_paths
+from apps.rentals.utils.media_cleanup_utils import queue_file_deletions
+
+
+class Command(BaseCommand):
+    help = ('Move rental images stored before content addressing into shared blobs and queue the old files '
+            'for sweep_media_files. Run generate_image_derivatives afterwards to recreate their derivatives')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        images = Image.objects.filter(blob__isnull=True).order_by('id')
+        migrated = missing = 0
+        last_id = 0
+
+        while True:
+            batch = list(images.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for image in batch:
+                old_names = [image.image.name, *get_derivative_paths(image.id).values()]
+                try:
+                    with transaction.atomic():
+                        with image.image.open('rb') as file:
+                            blob = acquire_image_blob(file)
+                        Image.objects.filter(id=image.id).update(
+                            blob=blob, image=blob.file, **{field: '' for field in Image.DERIVATIVE_FIELDS})
+                        # The sweeper keeps any of them another image still references
+                        queue_file_deletions(old_names)
+                except FileNotFoundError:
+                    missing += 1
+                    continue
+                migrated += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Moved {migrated} images into blobs, {missing} files were missing'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.bookings.utils.occupancy_utils import rebuild_booked_nights
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the booked nights table used by availability search from confirmed bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        bookings_count = rebuild_booked_nights(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt booked nights for {bookings_count} confirmed bookings'))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.rentals.utils.media_cleanup_utils import queue_orphan_files, sweep_pending_deletions, sweep_unused_blobs
+
+
+class Command(BaseCommand):
+    help = 'Remove rental image files queued for deletion and blobs no image references anymore'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--orphans', action='store_true',
+                            help='Also scan the media directories for files no image or blob references')
+        parser.add_argument('--grace-seconds', type=int, default=settings.MEDIA_ORPHAN_GRACE_SECONDS)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        orphans = 0
+        if options['orphans']:
+            orphans = queue_orphan_files(batch_size=batch_size, grace_seconds=options['grace_seconds'])
+        blobs = sweep_unused_blobs(batch_size=batch_size)
+        files = sweep_pending_deletions(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {blobs} unused blobs, processed {files} queued files including {orphans} orphans'
+        ))
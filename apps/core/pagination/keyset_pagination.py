@@ -0,0 +1,137 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class CursorValueEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates microseconds, which would break equality on the sort key
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the queryset's own ordering plus an `id` tiebreaker.
+
+    Pages are fetched with a `WHERE (sort key, id) > (last sort key, last id)` predicate instead of
+    OFFSET, and no COUNT query is issued, so every page costs the same. Ordering fields must be
+    non-nullable model fields or annotations.
+
+    @cursor_query_param: 'cursor' : str : Query parameter holding the opaque cursor
+    @mode_query_param: 'pagination' : str : Query parameter used to opt in with `pagination=cursor`
+    @page_size: PAGE_SIZE : int : Number of results per page
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        return cls.cursor_query_param in request.query_params or \
+            request.query_params.get(cls.mode_query_param) == 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(cursor))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_ordering(self, queryset):
+        ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+        if not any(field.lstrip('-') == 'id' for field in ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    def get_keyset_filter(self, values):
+        keyset_filter = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = Q(**{f'{name}__{lookup}': values[index]})
+            for previous_field, previous_value in zip(self.ordering[:index], values[:index]):
+                condition &= Q(**{previous_field.lstrip('-'): previous_value})
+            keyset_filter |= condition
+        return keyset_filter
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, field.lstrip('-')) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def encode_cursor(self, values):
+        payload = json.dumps({'o': self.ordering, 'v': values}, cls=CursorValueEncoder)
+        return urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError, BinasciiError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor is only valid for the ordering it was issued for
+        if not isinstance(payload, dict) or payload.get('o') != self.ordering or \
+                not isinstance(payload.get('v'), list) or len(payload['v']) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return payload['v']
+
+
+class KeysetPaginationMixin:
+    """
+    Lets clients of a viewset opt into KeysetPagination with `?pagination=cursor` while
+    `pagination_class` stays the default.
+    """
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.keyset_pagination_class.is_requested(self.request):
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -1,6 +1,42 @@
-from django.db.models import Sum
+from django.db.models import Sum, F, Case, When, Value, FloatField, ExpressionWrapper
+from django.db.models.functions import Cast
 from apps.reviews.models.review_model import Review
 
+# Bayesian prior for rating_score: a rental with few ratings is pulled towards RATING_PRIOR_MEAN
+# as if it had RATING_PRIOR_WEIGHT extra ratings of that value
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_WEIGHT = 5
+
+
+def calculate_average_rating(ratings_sum, ratings_count):
+    if ratings_count == 0:
+        return 0
+    return ratings_sum / ratings_count
+
+
+def calculate_rating_score(ratings_sum, ratings_count):
+    return (RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT + ratings_sum) / (RATING_PRIOR_WEIGHT + ratings_count)
+
+
+def get_rating_expressions():
+    """
+    Database expressions computing average_rating and rating_score from ratings_sum and ratings_count.
+
+    @return: dict : Field name mapped to the expression for queryset.update()
+    """
+    ratings_sum = Cast(F('ratings_sum'), FloatField())
+    return {
+        'average_rating': Case(
+            When(ratings_count=0, then=Value(0.0)),
+            default=ExpressionWrapper(ratings_sum / F('ratings_count'), output_field=FloatField()),
+            output_field=FloatField()
+        ),
+        'rating_score': ExpressionWrapper(
+            (ratings_sum + RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT) / (F('ratings_count') + RATING_PRIOR_WEIGHT),
+            output_field=FloatField()
+        ),
+    }
+
 
 def update_rating_and_reviews(rental):
     reviews_with_ratings = Review.objects.filter(rental=rental).exclude(rating__isnull=True)
@@ -10,4 +46,6 @@ def update_rating_and_reviews(rental):
     rental.ratings_count = reviews_with_ratings.count()
     rental.ratings_sum = reviews_with_ratings.aggregate(Sum('rating'))['rating__sum'] or 0
     rental.reviews_count = reviews_with_comments.count()
-    rental.save(update_fields=['ratings_sum', 'ratings_count', 'reviews_count'])
+    rental.average_rating = calculate_average_rating(rental.ratings_sum, rental.ratings_count)
+    rental.rating_score = calculate_rating_score(rental.ratings_sum, rental.ratings_count)
+    rental.save(update_fields=['ratings_sum', 'ratings_count', 'reviews_count', 'average_rating', 'rating_score'])
@@ -27,8 +27,8 @@ class RentalAdmin(admin.ModelAdmin):
     fieldsets = (
         (None, {
             'fields': (
-            'id', 'title', 'description', 'address', 'location', 'city', 'country', 'price', 'rooms', 'property_type',
-            'status', 'verified', 'rejected', 'rejection_reason', 'user')
+            'id', 'title', 'description', 'address', 'location', 'city', 'country', 'latitude', 'longitude', 'price',
+            'rooms', 'property_type', 'status', 'verified', 'rejected', 'rejection_reason', 'user')
         }),
         ('Dates', {
             'fields': ('created_at', 'updated_at')
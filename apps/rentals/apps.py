@@ -7,4 +7,5 @@ class RentalsConfig(AppConfig):
 
     def ready(self):
         import apps.rentals.signals.delete_image_file_signal
+        import apps.rentals.signals.tags_mask_signal
         import apps.rentals.signals
\ No newline at end of file
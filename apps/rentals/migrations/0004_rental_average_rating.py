@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:14
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+# Bayesian prior of rating_score at the time of this migration
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_WEIGHT = 5
+
+
+def fill_ratings(apps, schema_editor):
+    Rental = apps.get_model('rentals', 'Rental')
+    ratings_sum = Cast(F('ratings_sum'), FloatField())
+    Rental.objects.update(
+        average_rating=Case(
+            When(ratings_count=0, then=Value(0.0)),
+            default=ExpressionWrapper(ratings_sum / F('ratings_count'), output_field=FloatField()),
+            output_field=FloatField()
+        ),
+        rating_score=ExpressionWrapper(
+            (ratings_sum + RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT) / (F('ratings_count') + RATING_PRIOR_WEIGHT),
+            output_field=FloatField()
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0003_initial_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='average_rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rental',
+            name='rating_score',
+            field=models.FloatField(default=3.0),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['status', 'verified', 'average_rating'], name='rental_active_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['status', 'verified', 'rating_score'], name='rental_active_score_idx'),
+        ),
+    ]
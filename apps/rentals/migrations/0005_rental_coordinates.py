@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0004_rental_average_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='rental',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='rental',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
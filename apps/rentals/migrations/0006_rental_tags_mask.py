@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:16
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# TagChoices in declaration order at the time of this migration, bit N is the N-th tag
+TAG_NAMES = [
+    'Non-Smoking Rooms', 'Spa and Wellness Center', 'Fitness Center', 'Accessible Facilities', 'Room Service',
+    'Free Wi-Fi', 'Parking', 'Air Conditioning', 'Coffee/Tea Maker', 'Bar', 'Family Rooms', 'Terrace', 'Elevator',
+    'Garden', 'Heating', 'Swimming Pool', 'Pet Friendly',
+]
+
+
+def fill_tags_masks(apps, schema_editor):
+    Rental = apps.get_model('rentals', 'Rental')
+    bits = {name: 1 << position for position, name in enumerate(TAG_NAMES)}
+
+    masks = defaultdict(int)
+    for rental_id, tag_name in Rental.tags.through.objects.values_list('rental_id', 'tag__name').iterator():
+        masks[rental_id] |= bits.get(tag_name, 0)
+
+    rental_ids_by_mask = defaultdict(list)
+    for rental_id, mask in masks.items():
+        rental_ids_by_mask[mask].append(rental_id)
+    for mask, rental_ids in rental_ids_by_mask.items():
+        Rental.objects.filter(id__in=rental_ids).update(tags_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0005_rental_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='tags_mask',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_tags_masks, migrations.RunPython.noop),
+    ]
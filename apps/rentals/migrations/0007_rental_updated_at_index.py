@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0006_rental_tags_mask'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rental',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0007_rental_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='medium',
+            field=models.ImageField(blank=True, editable=False, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='medium_webp',
+            field=models.ImageField(blank=True, editable=False, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='thumbnail_webp',
+            field=models.ImageField(blank=True, editable=False, upload_to=''),
+        ),
+    ]
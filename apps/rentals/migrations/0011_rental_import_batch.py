@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0010_pending_file_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='import_batch',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0011_rental_import_batch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='image',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to='images/rental_images/'),
+        ),
+    ]
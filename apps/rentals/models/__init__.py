@@ -0,0 +1,2 @@
+from .image_blob_model import ImageBlob
+from .pending_file_deletion_model import PendingFileDeletion
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class ImageBlob(models.Model):
+    """
+    A stored image file, shared by every Image with the same content. Blobs whose ref_count
+    has dropped to zero are removed by the sweep_media_files command.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    # Storage path of the file, derived from the hash
+    file = models.CharField(max_length=255)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count})"
@@ -1,17 +1,36 @@
-from django.db import models
-import os
+from django.db import models, transaction
+
+from apps.rentals.utils.image_blob_utils import acquire_image_blob
 
 
 class Image(models.Model):
     rental = models.ForeignKey('Rental', related_name='images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to='images/rental_images/')
+    # Indexed for the media sweeper, which looks up files of images stored before blobs by path
+    image = models.ImageField(upload_to='images/rental_images/', db_index=True)
+    # Content-addressed file shared with other images of the same content, null for images stored
+    # before blobs until the migrate_image_blobs command has run
+    blob = models.ForeignKey(
+        'ImageBlob', related_name='images', null=True, blank=True, editable=False, on_delete=models.PROTECT)
     is_main = models.BooleanField(default=False)
+    # Resized copies written by image_derivative_utils after upload, empty until they are generated
+    thumbnail = models.ImageField(blank=True, editable=False)
+    thumbnail_webp = models.ImageField(blank=True, editable=False)
+    medium = models.ImageField(blank=True, editable=False)
+    medium_webp = models.ImageField(blank=True, editable=False)
+
+    DERIVATIVE_FIELDS = ['thumbnail', 'thumbnail_webp', 'medium', 'medium_webp']
 
     def __str__(self):
         return f"Image {self.id}"
 
-    def delete(self, *args, **kwargs):
-        # Удаление файла с диска
-        if self.image and os.path.isfile(self.image.path):
-            os.remove(self.image.path)
-        super().delete(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        if not self.image or self.image._committed:
+            super().save(*args, **kwargs)
+            return
+
+        # A new upload is stored once per content and the image points at the shared file
+        with transaction.atomic():
+            self.blob = acquire_image_blob(self.image.file)
+            self.image.name = self.blob.file
+            self.image._committed = True
+            super().save(*args, **kwargs)
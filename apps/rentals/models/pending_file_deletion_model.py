@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class PendingFileDeletion(models.Model):
+    """
+    A media file queued for removal by the sweep_media_files command, so deletes never touch
+    the filesystem on the request thread.
+    """
+    # Storage path relative to MEDIA_ROOT
+    path = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.path
@@ -1,22 +1,8 @@
 from django.db import models
 from django.conf import settings
-from django.core.cache import cache
-from django.utils import timezone
-from datetime import timedelta
-from django.db.models import F, ExpressionWrapper, FloatField
-from django.db.models.functions import Coalesce
 
 from apps.rentals.choices.rental_choice import PropertyTypeChoices
-
-
-class RentalManager(models.Manager):
-    def with_average_rating(self):
-        return self.annotate(
-            average_rating=ExpressionWrapper(
-                Coalesce(F('ratings_sum'), 0) / Coalesce(F('ratings_count'), 1),
-                output_field=FloatField()
-            )
-        )
+from apps.rentals.utils.geo_utils import encode_geohash
 
 
 class Rental(models.Model):
@@ -26,14 +12,21 @@ class Rental(models.Model):
     location = models.CharField(max_length=40, null=True, blank=True)
     city = models.CharField(max_length=40)
     country = models.CharField(max_length=40)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Derived from latitude/longitude on save; prefix lookups on it prune radius and bounding-box searches
+    geohash = models.CharField(max_length=12, null=True, blank=True, db_index=True, editable=False)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     rooms = models.IntegerField()
     property_type = models.CharField(max_length=50, choices=PropertyTypeChoices.choices)
     status = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Indexed for the search snapshot, which re-checks rentals edited after it was built
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     tags = models.ManyToManyField('Tag', related_name='rentals')
+    # Bitmask of the rental's tags (see tag_mask_utils), kept in sync with the tags relation by tags_mask_signal
+    tags_mask = models.IntegerField(default=0, editable=False)
     availability_start_date = models.DateField(null=True, blank=True)
     availability_end_date = models.DateField(null=True, blank=True)
     additional_images = models.ManyToManyField('Image', related_name='rentals')
@@ -42,28 +35,38 @@ class Rental(models.Model):
     ratings_sum = models.IntegerField(default=0)
     ratings_count = models.IntegerField(default=0)
     reviews_count = models.IntegerField(default=0)
+    # Denormalized from ratings_sum / ratings_count by update_rating_and_reviews so rating filters and sorts use an index
+    average_rating = models.FloatField(default=0)
+    # A rental without ratings scores the prior mean, RATING_PRIOR_MEAN in apps.core.utils.rating_utils
+    rating_score = models.FloatField(default=3.0)
     verified = models.BooleanField(default=False)
+    # Chunk of a bulk import the rental was inserted in, lets rental_import_utils find the IDs of rentals
+    # bulk inserted on backends that don't return them (MySQL)
+    import_batch = models.UUIDField(null=True, blank=True, editable=False, db_index=True)
     rejected = models.BooleanField(default=False)
     rejection_reason = models.TextField(null=True, blank=True)
 
-    objects = RentalManager()
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'verified', 'average_rating'], name='rental_active_rating_idx'),
+            models.Index(fields=['status', 'verified', 'rating_score'], name='rental_active_score_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-    def increment_views(self, user, ip_address):
-        now = timezone.now()
-        cache_key = f"rental_view_{self.id}_{user.id if user.is_authenticated else ip_address}"
-        last_viewed = cache.get(cache_key)
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = None
 
-        if not last_viewed or (now - last_viewed) > timedelta(seconds=10):
-            self.views_count += 1
-            self.save(update_fields=['views_count'])
-            cache.set(cache_key, now, timeout=10)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'}.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
 
     def get_average_rating(self):
-        if self.ratings_count == 0:
-            return 0
-        return round(self.ratings_sum / self.ratings_count, 1)
+        return round(self.average_rating, 1)
 
     get_average_rating.short_description = 'Average Rating'
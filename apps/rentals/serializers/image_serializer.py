@@ -2,7 +2,38 @@ from rest_framework import serializers
 from apps.rentals.models.image_rental_model import Image
 
 
+def get_image_url(image, size=None, request=None):
+    """
+    URL of an image in the requested size, the original file until that size has been generated.
+
+    @param image: Image : Rental image
+    @param size: str : One of Image.DERIVATIVE_FIELDS, None for the original
+    @param request: Request : Makes the URL absolute when given
+
+    @return: str : URL of the file
+    """
+    file = (getattr(image, size) if size in Image.DERIVATIVE_FIELDS else None) or image.image
+    return request.build_absolute_uri(file.url) if request else file.url
+
+
+def get_image_sizes(image, request=None):
+    return {size: get_image_url(image, size, request) for size in Image.DERIVATIVE_FIELDS if getattr(image, size)}
+
+
 class ImageSerializer(serializers.ModelSerializer):
+    """
+    `image` is the size given as `image_size` in the serializer context, list views ask for thumbnails.
+    `sizes` holds every derivative generated so far, for responsive images.
+    """
+    image = serializers.SerializerMethodField()
+    sizes = serializers.SerializerMethodField()
+
     class Meta:
         model = Image
-        fields = ['id', 'image', 'is_main']
+        fields = ['id', 'image', 'is_main', 'sizes']
+
+    def get_image(self, obj):
+        return get_image_url(obj, self.context.get('image_size'), self.context.get('request'))
+
+    def get_sizes(self, obj):
+        return get_image_sizes(obj, self.context.get('request'))
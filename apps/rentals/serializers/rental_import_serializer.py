@@ -0,0 +1,35 @@
+import os
+
+from rest_framework import serializers
+
+from apps.rentals.choices.rental_choice import TagChoices
+from apps.rentals.models.rental_model import Rental
+
+
+class RentalImportRowSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk rental import. `images` are paths relative to the `images_dir`
+    given in the serializer context.
+    """
+    tags = serializers.ListField(child=serializers.ChoiceField(choices=TagChoices.choices), required=False, default=list)
+    images = serializers.ListField(child=serializers.CharField(max_length=255), required=False, default=list)
+    latitude = serializers.FloatField(min_value=-90, max_value=90, required=False, allow_null=True)
+    longitude = serializers.FloatField(min_value=-180, max_value=180, required=False, allow_null=True)
+
+    class Meta:
+        model = Rental
+        fields = [
+            'title', 'description', 'address', 'location', 'city', 'country', 'latitude', 'longitude', 'price',
+            'rooms', 'property_type', 'availability_start_date', 'availability_end_date', 'contact_info',
+            'tags', 'images',
+        ]
+
+    def validate_images(self, value):
+        images_dir = os.path.realpath(self.context['images_dir'])
+        paths = []
+        for name in value:
+            path = os.path.realpath(os.path.join(images_dir, name))
+            if os.path.commonpath([images_dir, path]) != images_dir or not os.path.isfile(path):
+                raise serializers.ValidationError(f"Image {name} was not found in the import directory.")
+            paths.append(path)
+        return paths
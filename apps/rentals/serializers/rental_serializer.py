@@ -1,6 +1,8 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
+from apps.rentals.models.image_rental_model import Image
 from apps.rentals.models.rental_model import Rental
-from apps.rentals.serializers.image_serializer import ImageSerializer
+from apps.rentals.serializers.image_serializer import ImageSerializer, get_image_sizes, get_image_url
 from apps.rentals.models.tag_model import Tag
 
 
@@ -14,18 +16,36 @@ class RentalSerializer(serializers.ModelSerializer):
     )
     average_rating = serializers.SerializerMethodField()
     username = serializers.CharField(source='user.username', read_only=True)
+    latitude = serializers.FloatField(min_value=-90, max_value=90, required=False, allow_null=True)
+    longitude = serializers.FloatField(min_value=-180, max_value=180, required=False, allow_null=True)
 
     class Meta:
         model = Rental
         fields = [
-            'id', 'title', 'description', 'address', 'location', 'city', 'country', 'price', 'rooms',
-            'property_type', 'status', 'created_at', 'updated_at', 'user', 'username', 'tags',
+            'id', 'title', 'description', 'address', 'location', 'city', 'country', 'latitude', 'longitude', 'price',
+            'rooms', 'property_type', 'status', 'created_at', 'updated_at', 'user', 'username', 'tags',
             'availability_start_date', 'availability_end_date', 'main_image',
             'additional_images', 'views_count', 'contact_info', 'ratings_sum', 'ratings_count', 'average_rating',
             'verified', 'rejected', 'rejection_reason'
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'views_count', 'verified', 'rejection_reason']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Load everything the serializer reads from related tables along with the rentals,
+        so serializing a page costs the same number of queries whatever its size.
+
+        @param queryset: QuerySet : Rentals to serialize
+
+        @return: QuerySet : Rentals with the user joined and tags and images prefetched
+        """
+        # main_image and additional_images are both resolved from the one images prefetch
+        return queryset.select_related('user').prefetch_related(
+            'tags',
+            Prefetch('images', queryset=Image.objects.order_by('id')),
+        )
+
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         rental = Rental.objects.create(**validated_data)
@@ -49,11 +69,13 @@ class RentalSerializer(serializers.ModelSerializer):
         return instance
 
     def get_main_image(self, obj):
-        main_image = obj.images.filter(is_main=True).first()
+        # Picked from images.all() so prefetched images are reused instead of queried per rental
+        main_image = next((image for image in obj.images.all() if image.is_main), None)
         if main_image:
             return {
                 'id': main_image.id,
-                'image': main_image.image.url
+                'image': get_image_url(main_image, self.context.get('image_size')),
+                'sizes': get_image_sizes(main_image),
             }
         return None
 
@@ -1,10 +1,15 @@
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from apps.rentals.models.image_rental_model import Image
-import os
+from apps.rentals.utils.image_blob_utils import release_image_blob
+from apps.rentals.utils.media_cleanup_utils import queue_file_deletions
 
 
 @receiver(post_delete, sender=Image)
 def delete_image_file(sender, instance, **kwargs):
-    if instance.image and os.path.isfile(instance.image.path):
-        os.remove(instance.image.path)
+    # Files are removed by the sweep_media_files command, shared files only with their last reference
+    if instance.blob_id:
+        release_image_blob(instance.blob_id)
+        return
+
+    queue_file_deletions([getattr(instance, field).name for field in ['image', *Image.DERIVATIVE_FIELDS]])
@@ -0,0 +1,36 @@
+from collections import defaultdict
+
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from apps.rentals.models.rental_model import Rental
+from apps.rentals.utils.tag_mask_utils import calculate_tags_masks
+
+
+def update_tags_masks(rental_ids):
+    rows = Rental.tags.through.objects.filter(rental_id__in=rental_ids).values_list('rental_id', 'tag__name')
+    masks = calculate_tags_masks(rows)
+
+    rental_ids_by_mask = defaultdict(list)
+    for rental_id in rental_ids:
+        rental_ids_by_mask[masks.get(rental_id, 0)].append(rental_id)
+    for mask, ids in rental_ids_by_mask.items():
+        Rental.objects.filter(id__in=ids).update(tags_mask=mask)
+    return masks
+
+
+@receiver(m2m_changed, sender=Rental.tags.through)
+def update_tags_mask_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # tag.rentals.clear() does not report the affected rentals afterwards
+        instance._cleared_rental_ids = list(instance.rentals.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        instance.tags_mask = update_tags_masks([instance.pk]).get(instance.pk, 0)
+    elif action == 'post_clear':
+        update_tags_masks(instance.__dict__.pop('_cleared_rental_ids', []))
+    else:
+        update_tags_masks(list(pk_set))
@@ -1,3 +1,75 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.rentals.models.image_rental_model import Image
+from apps.rentals.models.rental_model import Rental
+from apps.rentals.models.tag_model import Tag
+from apps.users.models.user_model import User
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SEARCH_RESULTS_CACHE_TIMEOUT=0)
+class RentalListQueryCountTest(TestCase):
+    """
+    A page of rentals costs a fixed number of queries: the user is joined in and tags and images
+    are prefetched, however many rentals the page holds.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='landlord', email='landlord@example.com', password='password')
+        cls.tags = [Tag.objects.get_or_create(name=name)[0] for name in ('Parking', 'Free Wi-Fi')]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_rentals(self, count):
+        for index in range(count):
+            rental = Rental.objects.create(
+                title=f'Flat {index}', description='Bright flat', address='Main street 1', city='Berlin',
+                country='Germany', price=100 + index, rooms=2, property_type='Apartment', user=self.user,
+                verified=True,
+            )
+            rental.tags.set(self.tags)
+            Image.objects.create(rental=rental, image=f'images/rental_images/{index}-main.jpg', is_main=True)
+            Image.objects.create(rental=rental, image=f'images/rental_images/{index}-extra.jpg')
+
+    def assert_page_queries(self, url, expected_queries, expected_rows):
+        for rows in expected_rows:
+            self.create_rentals(rows - Rental.objects.count())
+            with self.assertNumQueries(expected_queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), rows)
+
+    def test_rental_list(self):
+        # COUNT, page, tags, images
+        self.assert_page_queries('/api/v1/rentals/', 4, [1, 10])
+
+    def test_rental_list_with_cursor(self):
+        # page, tags, images
+        self.assert_page_queries('/api/v1/rentals/?pagination=cursor', 3, [1, 10])
+
+    def test_search_list(self):
+        # COUNT, page, tags, images
+        self.assert_page_queries('/api/v1/search/?sort_by=min_price', 4, [1, 10])
+
+    def test_serialized_relations(self):
+        self.create_rentals(1)
+        rental = self.client.get('/api/v1/rentals/').data['results'][0]
+
+        self.assertEqual(rental['username'], 'landlord')
+        self.assertEqual(sorted(rental['tags']), ['Free Wi-Fi', 'Parking'])
+        self.assertEqual(len(rental['additional_images']), 2)
+        self.assertTrue(rental['main_image']['image'].endswith('0-main.jpg'))
+
+    @override_settings(SEARCH_RESULTS_CACHE_TIMEOUT=60)
+    def test_cached_search_page(self):
+        self.create_rentals(10)
+        self.client.get('/api/v1/search/?sort_by=min_price')
+
+        # Rentals by ID, tags, images; the COUNT comes from the cache
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/search/?sort_by=min_price')
+        self.assertEqual(len(response.data['results']), 10)
@@ -0,0 +1,147 @@
+import math
+
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import Cos, Power, Radians, Sin
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+# Upper bound of geohash prefixes OR-ed into one candidate query
+MAX_COVERING_CELLS = 32
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+
+    while len(geohash) < precision:
+        value_range, value = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+
+    return ''.join(geohash)
+
+
+def get_cell_size(precision):
+    lat_bits = 5 * precision // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def get_covering_geohashes(min_lat, min_lng, max_lat, max_lng):
+    """
+    Find the longest geohash prefixes whose cells together cover a bounding box.
+
+    @param min_lat: float : Southern edge of the box
+    @param min_lng: float : Western edge of the box
+    @param max_lat: float : Northern edge of the box
+    @param max_lng: float : Eastern edge of the box
+
+    @return: set : Geohash prefixes, empty when the box is too large to be worth pruning
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_height, cell_width = get_cell_size(precision)
+        rows = range(math.floor(min_lat / cell_height), math.floor(max_lat / cell_height) + 1)
+        columns = range(math.floor(min_lng / cell_width), math.floor(max_lng / cell_width) + 1)
+        if len(rows) * len(columns) > MAX_COVERING_CELLS:
+            continue
+
+        # Geohash cells are aligned to multiples of the cell size, so each cell is identified by its centre
+        return {
+            encode_geohash((row + 0.5) * cell_height, (column + 0.5) * cell_width, precision)
+            for row in rows
+            for column in columns
+        }
+    return set()
+
+
+def get_bounding_box(latitude, longitude, radius_km):
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(latitude))
+    lng_delta = 180.0 if cos_lat < 1e-9 else min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def get_haversine_expression(latitude, longitude):
+    """
+    Database expression of the haversine term between each rental and a point, the square of the sine
+    of half the central angle. It grows with the distance, so radius checks compare it without asin and sqrt.
+
+    @param latitude: float : Latitude of the point
+    @param longitude: float : Longitude of the point
+
+    @return: Expression : Haversine term of the rental's coordinates
+    """
+    rental_lat, rental_lng = Radians(F('latitude')), Radians(F('longitude'))
+    lat_delta = (rental_lat - Value(math.radians(latitude))) / Value(2.0)
+    lng_delta = (rental_lng - Value(math.radians(longitude))) / Value(2.0)
+    return (
+        Power(Sin(lat_delta), 2)
+        + Value(math.cos(math.radians(latitude))) * Cos(rental_lat) * Power(Sin(lng_delta), 2)
+    )
+
+
+def filter_within_bounding_box(queryset, min_lat, min_lng, max_lat, max_lng):
+    """
+    Restrict rentals to a bounding box, pruning candidates with indexed geohash prefix lookups first.
+
+    @param queryset: QuerySet : Rentals to filter
+    @param min_lat: float : Southern edge of the box
+    @param min_lng: float : Western edge of the box
+    @param max_lat: float : Northern edge of the box
+    @param max_lng: float : Eastern edge of the box
+
+    @return: QuerySet : Rentals located inside the box
+    """
+    geohash_filter = Q()
+    for geohash in get_covering_geohashes(min_lat, min_lng, max_lat, max_lng):
+        geohash_filter |= Q(geohash__startswith=geohash)
+
+    return queryset.filter(
+        geohash_filter,
+        latitude__gte=min_lat,
+        latitude__lte=max_lat,
+        longitude__gte=min_lng,
+        longitude__lte=max_lng,
+    )
+
+
+def filter_within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Restrict rentals to a radius around a point: the geohash-pruned bounding box supplies the
+    candidates, the exact great-circle distance is checked by the database in the same query.
+
+    @param queryset: QuerySet : Rentals to filter
+    @param latitude: float : Latitude of the centre
+    @param longitude: float : Longitude of the centre
+    @param radius_km: float : Radius in kilometres
+
+    @return: QuerySet : Rentals located within the radius
+    """
+    candidates = filter_within_bounding_box(queryset, *get_bounding_box(latitude, longitude, radius_km))
+    # Same bound as haversine_km(...) <= radius_km, capped at the antipode
+    max_haversine = math.sin(min(radius_km / (2 * EARTH_RADIUS_KM), math.pi / 2)) ** 2
+    return candidates.alias(
+        haversine=ExpressionWrapper(get_haversine_expression(latitude, longitude), output_field=FloatField())
+    ).filter(haversine__lte=max_haversine)
@@ -0,0 +1,90 @@
+import hashlib
+import os
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from apps.rentals.models.image_blob_model import ImageBlob
+from apps.rentals.utils.image_processing_utils import get_derivative_paths
+
+BLOBS_DIR = 'images/blobs'
+
+
+def get_file_sha256(file):
+    # Uploads are hashed while they stream in by the hashing upload handlers
+    sha256 = getattr(file, 'sha256', None)
+    if sha256:
+        return sha256
+
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_blob_path(sha256, name):
+    extension = os.path.splitext(name)[1].lower()
+    return f'{BLOBS_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}'
+
+
+def acquire_image_blob(file):
+    """
+    Add a reference to the blob holding the file's content, storing the file only when
+    no image references that content yet.
+
+    @param file: File : Uploaded or stored image file
+
+    @return: ImageBlob : Blob holding the content
+    """
+    sha256 = get_file_sha256(file)
+    with transaction.atomic():
+        # The row lock orders this against remove_unused_blob for the same content
+        blob = ImageBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is None:
+            try:
+                with transaction.atomic():
+                    blob = ImageBlob.objects.create(
+                        sha256=sha256, file=get_blob_path(sha256, file.name), size=file.size)
+            except IntegrityError:
+                blob = ImageBlob.objects.select_for_update().get(sha256=sha256)
+
+        # A blob without references may have lost its file already
+        if blob.ref_count <= 0:
+            if default_storage.exists(blob.file):
+                default_storage.delete(blob.file)
+            blob.file = default_storage.save(blob.file, file)
+
+        blob.ref_count += 1
+        blob.save(update_fields=['file', 'ref_count'])
+    return blob
+
+
+def remove_unused_blob(blob_id):
+    """
+    Delete a blob and its files if nothing references it anymore.
+
+    @param blob_id: int : ID of the blob
+
+    @return: bool : Whether the blob was removed
+    """
+    with transaction.atomic():
+        blob = ImageBlob.objects.select_for_update().filter(id=blob_id, ref_count__lte=0).first()
+        if blob is None or blob.images.exists():
+            return False
+
+        for name in [blob.file, *get_derivative_paths(blob.sha256).values()]:
+            default_storage.delete(name)
+        blob.delete()
+    return True
+
+
+def release_image_blob(blob_id):
+    """
+    Drop a reference to a blob. Blobs left without references are removed by the sweep_media_files command.
+
+    @param blob_id: int : ID of the blob
+
+    @return: None
+    """
+    ImageBlob.objects.filter(id=blob_id).update(ref_count=F('ref_count') - 1)
@@ -0,0 +1,130 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from apps.rentals.models.image_rental_model import Image
+from apps.rentals.utils.image_processing_utils import generate_derivatives
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the process pool shared by the requests of this worker, created on first use.
+    Spawned rather than forked so the pool never inherits the server's threads or database connections.
+    """
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_DERIVATIVE_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+
+def save_derivatives(image_id, paths):
+    Image.objects.filter(id=image_id).update(**paths)
+
+
+def get_derivatives_key(image):
+    # Images sharing a blob share its derivatives
+    return image.blob.sha256 if image.blob_id else image.id
+
+
+def get_shared_derivatives(image):
+    if not image.blob_id:
+        return None
+    return Image.objects.filter(blob_id=image.blob_id).exclude(thumbnail='').values(*Image.DERIVATIVE_FIELDS).first()
+
+
+def on_derivatives_done(image_id, future):
+    # Runs in the pool's result thread, which keeps its own database connection
+    close_old_connections()
+    try:
+        save_derivatives(image_id, future.result())
+    except Exception:
+        logger.exception('Could not generate derivatives of image %s', image_id)
+    finally:
+        close_old_connections()
+
+
+def generate_image_derivatives(images):
+    """
+    Generate the derivatives of images in the process pool, or right away when IMAGE_DERIVATIVE_WORKERS is 0.
+
+    @param images: list : Images whose original file is stored
+
+    @return: None
+    """
+    for image in images:
+        shared = get_shared_derivatives(image)
+        if shared:
+            save_derivatives(image.id, shared)
+            continue
+
+        task = (settings.MEDIA_ROOT, get_derivatives_key(image), image.image.name)
+        if not settings.IMAGE_DERIVATIVE_WORKERS:
+            save_derivatives(image.id, generate_derivatives(*task))
+            continue
+        future = get_executor().submit(generate_derivatives, *task)
+        future.add_done_callback(partial(on_derivatives_done, image.id))
+
+
+def schedule_image_derivatives(images):
+    """
+    Generate the derivatives of new images once the transaction that stored them has committed,
+    so the request never waits for resizing and workers never see uncommitted rows.
+
+    @param images: list : Newly created images
+
+    @return: None
+    """
+    images = list(images)
+    if images:
+        transaction.on_commit(partial(generate_image_derivatives, images))
+
+
+def backfill_image_derivatives(batch_size=100, force=False):
+    """
+    Generate the derivatives of stored images that have none, or of every image with force.
+
+    @param batch_size: int : Number of images read and processed per batch
+    @param force: bool : Regenerate derivatives that already exist
+
+    @return: tuple : Number of images processed and number that failed
+    """
+    images = Image.objects.select_related('blob').order_by('id').only('id', 'image', 'blob__sha256')
+    if not force:
+        images = images.filter(thumbnail='')
+
+    processed = failed = 0
+    last_id = 0
+    while True:
+        batch = list(images.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return processed, failed
+        last_id = batch[-1].id
+
+        tasks = [(settings.MEDIA_ROOT, get_derivatives_key(image), image.image.name) for image in batch]
+        if settings.IMAGE_DERIVATIVE_WORKERS:
+            results = [get_executor().submit(generate_derivatives, *task).result for task in tasks]
+        else:
+            results = [partial(generate_derivatives, *task) for task in tasks]
+
+        for image, result in zip(batch, results):
+            try:
+                paths = result()
+            except Exception:
+                logger.exception('Could not generate derivatives of image %s', image.id)
+                failed += 1
+                continue
+            save_derivatives(image.id, paths)
+            processed += 1
@@ -0,0 +1,53 @@
+import os
+
+from PIL import Image as PillowImage, ImageOps
+
+DERIVATIVES_DIR = 'images/rental_images/derivatives'
+# Derivative name -> longest side in pixels
+DERIVATIVE_SIZES = {
+    'thumbnail': 320,
+    'medium': 1024,
+}
+# Image field suffix -> file extension and Pillow save options
+DERIVATIVE_FORMATS = {
+    '': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+    '_webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+}
+
+
+def get_derivative_paths(key):
+    """
+    @param key: str : Hash of the image's blob, or the image ID for images stored before blobs
+
+    @return: dict : Image field name -> path of the derivative relative to MEDIA_ROOT
+    """
+    return {
+        f'{size_name}{suffix}': f'{DERIVATIVES_DIR}/{key}-{size_name}.{extension}'
+        for size_name in DERIVATIVE_SIZES for suffix, (extension, _) in DERIVATIVE_FORMATS.items()
+    }
+
+
+def generate_derivatives(media_root, key, name):
+    """
+    Write the resized JPEG and WebP versions of an uploaded rental image.
+
+    Runs in the derivative process pool, so it only works with files and needs no Django setup.
+
+    @param media_root: str : MEDIA_ROOT of the project
+    @param key: str : Derivative file name prefix, see get_derivative_paths
+    @param name: str : Path of the original file relative to media_root
+
+    @return: dict : Image field name -> path of the derivative relative to media_root
+    """
+    os.makedirs(os.path.join(media_root, DERIVATIVES_DIR), exist_ok=True)
+    paths = get_derivative_paths(key)
+    with PillowImage.open(os.path.join(media_root, name)) as original:
+        # Phone photos are often stored sideways with an EXIF orientation tag
+        source = ImageOps.exif_transpose(original).convert('RGB')
+
+    for size_name, size in DERIVATIVE_SIZES.items():
+        resized = source.copy()
+        resized.thumbnail((size, size), PillowImage.Resampling.LANCZOS)
+        for suffix, (_, options) in DERIVATIVE_FORMATS.items():
+            resized.save(os.path.join(media_root, paths[f'{size_name}{suffix}']), **options)
+    return paths
@@ -0,0 +1,168 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from apps.rentals.models.image_blob_model import ImageBlob
+from apps.rentals.models.image_rental_model import Image
+from apps.rentals.models.pending_file_deletion_model import PendingFileDeletion
+from apps.rentals.utils.image_blob_utils import BLOBS_DIR, remove_unused_blob
+from apps.rentals.utils.image_processing_utils import DERIVATIVES_DIR
+
+# Directories holding rental image files, relative to MEDIA_ROOT
+MEDIA_DIRS = ['images/rental_images', BLOBS_DIR, DERIVATIVES_DIR]
+
+
+def queue_file_deletions(paths):
+    """
+    Queue media files for the sweeper. Called inside the deleting transaction, so a rollback
+    keeps the files.
+
+    @param paths: list : Storage paths relative to MEDIA_ROOT
+
+    @return: None
+    """
+    PendingFileDeletion.objects.bulk_create(
+        [PendingFileDeletion(path=path) for path in paths if path], ignore_conflicts=True)
+
+
+def get_path_owner(path):
+    """
+    @param path: str : Storage path relative to MEDIA_ROOT
+
+    @return: tuple : ('blob', sha256) for blob files and their derivatives, ('image', image ID) for derivatives
+        of images stored before blobs, ('file', path) for their original files
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    if path.startswith(f'{BLOBS_DIR}/'):
+        return 'blob', name
+    if path.startswith(f'{DERIVATIVES_DIR}/'):
+        key = name.split('-')[0]
+        return ('image', int(key)) if key.isdigit() else ('blob', key)
+    return 'file', path
+
+
+def get_referenced_paths(paths, lock=False):
+    """
+    Find the paths still in use, looking each one up by what can own it: the blob hash, the image ID
+    of a derivative, or the original file of an image stored before blobs.
+
+    @param paths: list : Storage paths relative to MEDIA_ROOT
+    @param lock: bool : Lock the blob rows, and the absent blob hashes, until the transaction ends
+
+    @return: set : Paths among them still used by an image or a blob
+    """
+    owners = {path: get_path_owner(path) for path in paths}
+    keys = {kind: [key for owner_kind, key in owners.values() if owner_kind == kind]
+            for kind in ('blob', 'image', 'file')}
+
+    blobs = ImageBlob.objects.filter(sha256__in=keys['blob'])
+    if lock:
+        blobs = blobs.select_for_update()
+    referenced = {('blob', sha256) for sha256 in blobs.values_list('sha256', flat=True)}
+    # Derivatives of an image moved into a blob were replaced by the blob's
+    referenced.update(('image', image_id) for image_id in Image.objects.filter(
+        id__in=keys['image'], blob__isnull=True).values_list('id', flat=True))
+    referenced.update(('file', name) for name in Image.objects.filter(
+        image__in=keys['file']).values_list('image', flat=True))
+    return {path for path, owner in owners.items() if owner in referenced}
+
+
+def sweep_unused_blobs(batch_size=500):
+    """
+    Remove the files and rows of blobs whose last image is gone.
+
+    @param batch_size: int : Number of blobs read per query
+
+    @return: int : Number of blobs removed
+    """
+    removed = 0
+    last_id = 0
+    while True:
+        blob_ids = list(ImageBlob.objects.filter(id__gt=last_id, ref_count__lte=0).order_by('id')
+                        .values_list('id', flat=True)[:batch_size])
+        if not blob_ids:
+            return removed
+        last_id = blob_ids[-1]
+        # Each blob is removed under its row lock, see acquire_image_blob
+        removed += sum(remove_unused_blob(blob_id) for blob_id in blob_ids)
+
+
+def sweep_pending_deletions(batch_size=500):
+    """
+    Delete queued media files in batches. Files already gone are skipped and files
+    referenced again are kept.
+
+    Blob rows are locked from the reference check until the files are deleted, so an upload
+    recreating a blob either commits first and keeps its file, or waits and writes it afresh.
+
+    @param batch_size: int : Number of queued files handled per batch
+
+    @return: int : Number of queue entries processed
+    """
+    processed = 0
+    while True:
+        pending = list(PendingFileDeletion.objects.order_by('id').values_list('id', 'path')[:batch_size])
+        if not pending:
+            return processed
+
+        with transaction.atomic():
+            referenced = get_referenced_paths([path for _, path in pending], lock=True)
+            for _, path in pending:
+                if path not in referenced:
+                    # FileSystemStorage.delete ignores files that no longer exist
+                    default_storage.delete(path)
+            PendingFileDeletion.objects.filter(id__in=[pending_id for pending_id, _ in pending]).delete()
+        processed += len(pending)
+
+
+def iterate_media_files(grace_seconds):
+    cutoff = time.time() - grace_seconds
+    root = settings.MEDIA_ROOT
+    for media_dir in MEDIA_DIRS:
+        for directory, subdirectories, names in os.walk(os.path.join(root, media_dir)):
+            # Nested media dirs are walked on their own
+            subdirectories[:] = [
+                name for name in subdirectories
+                if os.path.relpath(os.path.join(directory, name), root) not in MEDIA_DIRS
+            ]
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) > cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                yield os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def queue_unreferenced_files(paths):
+    referenced = get_referenced_paths(paths)
+    orphans = [path for path in paths if path not in referenced]
+    queue_file_deletions(orphans)
+    return len(orphans)
+
+
+def queue_orphan_files(batch_size=500, grace_seconds=86400):
+    """
+    Queue rental image files that no image or blob references, such as files of uploads whose
+    transaction rolled back. Files modified within the grace period are left alone, they may
+    belong to an upload that has not committed yet.
+
+    @param batch_size: int : Number of files checked per query
+    @param grace_seconds: int : Minimum age of a file before it is considered an orphan
+
+    @return: int : Number of orphan files queued
+    """
+    queued = 0
+    batch = []
+    for path in iterate_media_files(grace_seconds):
+        batch.append(path)
+        if len(batch) >= batch_size:
+            queued += queue_unreferenced_files(batch)
+            batch = []
+    if batch:
+        queued += queue_unreferenced_files(batch)
+    return queued
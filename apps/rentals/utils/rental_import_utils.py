@@ -0,0 +1,255 @@
+import csv
+import json
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, transaction
+
+from apps.rentals.models.image_rental_model import Image
+from apps.rentals.models.rental_model import Rental
+from apps.rentals.models.tag_model import Tag
+from apps.rentals.serializers.rental_import_serializer import RentalImportRowSerializer
+from apps.rentals.utils.geo_utils import encode_geohash
+from apps.rentals.utils.image_blob_utils import acquire_image_blob, release_image_blob
+from apps.rentals.utils.image_derivative_utils import schedule_image_derivatives
+from apps.rentals.utils.tag_mask_utils import get_tags_mask
+from apps.search_and_filters.utils.search_cache_utils import bump_catalog_generation
+from apps.search_and_filters.utils.search_index_utils import index_new_rentals
+
+IMPORT_FORMATS = ['csv', 'jsonl']
+# Separator of the tags and images columns in CSV files
+CSV_LIST_SEPARATOR = '|'
+CSV_LIST_FIELDS = ['tags', 'images']
+
+
+def get_import_format(file_name, requested_format=None):
+    """
+    @param file_name: str : Name of the import file
+    @param requested_format: str : Format given explicitly, takes precedence over the file extension
+
+    @return: str : One of IMPORT_FORMATS
+
+    @raises: ValueError : If the format is not supported
+    """
+    file_format = (requested_format or os.path.splitext(file_name)[1].lstrip('.')).lower()
+    if file_format == 'ndjson':
+        file_format = 'jsonl'
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format, expected one of: {', '.join(IMPORT_FORMATS)}.")
+    return file_format
+
+
+def iterate_csv_rows(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        # Empty cells are treated as missing values
+        data = {name: value.strip() for name, value in row.items() if name and value and value.strip()}
+        for name in CSV_LIST_FIELDS:
+            if name in data:
+                data[name] = [item.strip() for item in data[name].split(CSV_LIST_SEPARATOR) if item.strip()]
+        yield reader.line_num, data, None
+
+
+def iterate_jsonl_rows(lines):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield line_number, None, {'non_field_errors': ['Invalid JSON.']}
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, {'non_field_errors': ['Each line must be a JSON object.']}
+            continue
+        yield line_number, data, None
+
+
+class RentalImporter:
+    """
+    Creates rentals from a stream of import rows, validating and inserting them in chunks.
+
+    Each chunk is inserted in one transaction with bulk_create for rentals, tag links and images;
+    image files are stored before it, so the transaction does no file I/O. Backends that can't return IDs from bulk inserts (MySQL) get them back with one lookup per chunk,
+    by the chunk's import_batch. Rows that fail validation, or make their chunk fail, are reported
+    with their line number and don't stop the import.
+    """
+
+    def __init__(self, user, verified=False, images_dir=None, batch_size=None):
+        self.user = user
+        self.verified = verified
+        self.images_dir = images_dir or settings.RENTAL_IMPORT_IMAGES_DIR
+        self.batch_size = batch_size or settings.RENTAL_IMPORT_BATCH_SIZE
+        self.tag_ids = dict(Tag.objects.values_list('name', 'id'))
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row_number, errors):
+        self.error_count += 1
+        if len(self.errors) < settings.RENTAL_IMPORT_MAX_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def get_tag_id(self, name):
+        if name not in self.tag_ids:
+            self.tag_ids[name] = Tag.objects.get_or_create(name=name)[0].id
+        return self.tag_ids[name]
+
+    def build_rental(self, data, tags):
+        # bulk_create bypasses Rental.save and the tags signal, so geohash and tags_mask are set here
+        rental = Rental(user=self.user, status=True, verified=self.verified, tags_mask=get_tags_mask(tags), **data)
+        if rental.latitude is not None and rental.longitude is not None:
+            rental.geohash = encode_geohash(rental.latitude, rental.longitude)
+        return rental
+
+    def acquire_blobs(self, rows):
+        """
+        Store the images of a chunk's rows, each in its own short transaction. Rows with an image
+        that can't be read are reported and left out of the chunk.
+
+        @param rows: list : (line number, validated row data) tuples
+
+        @return: list : (line number, validated row data, blobs of the row's images) tuples
+        """
+        acquired = []
+        for row_number, data in rows:
+            blobs = []
+            try:
+                for path in data['images']:
+                    with open(path, 'rb') as image_file:
+                        blobs.append(acquire_image_blob(File(image_file, name=os.path.basename(path))))
+            except (DatabaseError, OSError) as error:
+                self.release_blobs(blobs)
+                self.add_error(row_number, {'non_field_errors': [str(error)]})
+                continue
+            acquired.append((row_number, data, blobs))
+        return acquired
+
+    def release_blobs(self, blobs):
+        for blob in blobs:
+            release_image_blob(blob.id)
+
+    def create_rentals(self, rows):
+        import_batch = uuid.uuid4()
+        rentals = []
+        for _, data, blobs in rows:
+            data = dict(data)
+            tags = data.pop('tags')
+            data.pop('images')
+            rental = self.build_rental(data, tags)
+            rental.import_batch = import_batch
+            rentals.append((rental, tags, blobs))
+
+        new_rentals = [rental for rental, _, _ in rentals]
+        Rental.objects.bulk_create(new_rentals)
+        if new_rentals[0].pk is None:
+            # Auto-increment IDs of a bulk insert increase in row order
+            ids = Rental.objects.filter(import_batch=import_batch).order_by('id').values_list('id', flat=True)
+            for rental, rental_id in zip(new_rentals, ids):
+                rental.pk = rental_id
+        index_new_rentals(new_rentals)
+
+        Rental.tags.through.objects.bulk_create([
+            Rental.tags.through(rental_id=rental.id, tag_id=self.get_tag_id(name))
+            for rental, tags, _ in rentals for name in dict.fromkeys(tags)
+        ])
+
+        images = [
+            Image(rental=rental, image=blob.file, blob=blob, is_main=(index == 0))
+            for rental, _, blobs in rentals for index, blob in enumerate(blobs)
+        ]
+        Image.objects.bulk_create(images)
+        if images and images[0].pk is None:
+            # The chunk's rentals are new, so every image they have was inserted above
+            ids = Image.objects.filter(rental__import_batch=import_batch).order_by('id').values_list('id', flat=True)
+            for image, image_id in zip(images, ids):
+                image.pk = image_id
+        schedule_image_derivatives(images)
+        return len(rentals)
+
+    def import_chunk(self, rows):
+        rows = self.acquire_blobs(rows)
+        if not rows:
+            return
+        try:
+            with transaction.atomic():
+                self.created += self.create_rentals(rows)
+            return
+        except DatabaseError:
+            pass
+
+        # Retry row by row so only the rows the database rejects are reported, their image references are dropped
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    self.created += self.create_rentals([row])
+            except DatabaseError as error:
+                self.release_blobs(row[2])
+                self.add_error(row[0], {'non_field_errors': [str(error)]})
+
+    def run(self, rows):
+        """
+        @param rows: iterable : (line number, row data, parse errors) tuples
+
+        @return: dict : Number of created rentals, number of failed rows and the first failed rows' errors,
+            and an `error` when the file could not be read to the end
+        """
+        context = {'images_dir': self.images_dir}
+        chunk = []
+        row_number = 0
+        file_error = None
+        try:
+            for row_number, data, errors in rows:
+                if errors is None:
+                    serializer = RentalImportRowSerializer(data=data, context=context)
+                    if serializer.is_valid():
+                        chunk.append((row_number, serializer.validated_data))
+                    else:
+                        errors = serializer.errors
+                if errors is not None:
+                    self.add_error(row_number, errors)
+
+                if len(chunk) >= self.batch_size:
+                    self.import_chunk(chunk)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as error:
+            # The rest of the file can't be read, the rows read before it are still imported
+            file_error = f'The file could not be read after row {row_number}: {error}'
+        if chunk:
+            self.import_chunk(chunk)
+
+        if self.created:
+            # bulk_create sends no signals, search caches and the owner's role are refreshed once
+            bump_catalog_generation()
+            if self.user.role == 'User':
+                self.user.role = 'Landlord'
+                self.user.save(update_fields=['role'])
+
+        result = {'created': self.created, 'error_count': self.error_count, 'errors': self.errors}
+        if file_error:
+            result['error'] = file_error
+        return result
+
+
+def import_rentals(lines, file_format, user, verified=False, images_dir=None, batch_size=None):
+    """
+    Import rentals from CSV or JSON Lines, reading the input as a stream.
+
+    CSV files have a header row with RentalImportRowSerializer field names; tags and images are
+    separated by `|`. JSON Lines files have one object per line with the same fields, tags and images as lists.
+
+    @param lines: iterable : Lines of the import file as text
+    @param file_format: str : One of IMPORT_FORMATS
+    @param user: User : Owner of the imported rentals
+    @param verified: bool : Publish the rentals without moderation
+    @param images_dir: str : Directory the image paths of the rows are relative to, RENTAL_IMPORT_IMAGES_DIR by default
+    @param batch_size: int : Number of rows inserted per transaction, RENTAL_IMPORT_BATCH_SIZE by default
+
+    @return: dict : Number of created rentals, number of failed rows and the errors of the first failed rows,
+        and an `error` when the file is not valid UTF-8 or CSV past some row
+    """
+    rows = iterate_csv_rows(lines) if file_format == 'csv' else iterate_jsonl_rows(lines)
+    importer = RentalImporter(user, verified=verified, images_dir=images_dir, batch_size=batch_size)
+    return importer.run(rows)
@@ -0,0 +1,158 @@
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+
+from apps.rentals.models.rental_model import Rental
+from apps.rentals.utils.tag_mask_utils import get_tag_names
+from apps.search_and_filters.utils.search_index_utils import tokenize
+
+# Features are hashed with a sign bit into this many dimensions (the hashing trick)
+HASH_DIMENSIONS = 512
+# Title words count this many times as often as description words
+TITLE_WEIGHT = 2
+SIMILARITY_BLOCK_SIZE = 256
+
+
+def get_rental_features(rental):
+    features = Counter()
+    for token in tokenize(rental.title):
+        features[f'w:{token}'] += TITLE_WEIGHT
+    for token in tokenize(rental.description):
+        features[f'w:{token}'] += 1
+    for tag in get_tag_names(rental.tags_mask):
+        features[f'tag:{tag.casefold()}'] += 1
+    features[f'type:{rental.property_type.casefold()}'] += 1
+    features[f'city:{rental.city.casefold()}'] += 1
+    # Prices in the same power-of-two band share a feature
+    features[f'price:{int(math.log2(max(float(rental.price), 1)))}'] += 1
+    return features
+
+
+def hash_feature(feature):
+    digest = zlib.crc32(feature.encode())
+    return digest % HASH_DIMENSIONS, 1.0 if digest & 0x80000000 else -1.0
+
+
+def build_vectors(documents):
+    """
+    Turn feature counts into L2-normalized TF-IDF vectors hashed into HASH_DIMENSIONS columns.
+
+    @param documents: list : Feature Counter of every rental
+
+    @return: ndarray : float32 matrix with one row per document
+    """
+    document_frequency = Counter(feature for features in documents for feature in features)
+    total = len(documents)
+    hashed = {feature: hash_feature(feature) for feature in document_frequency}
+
+    vectors = np.zeros((total, HASH_DIMENSIONS), dtype=np.float32)
+    for row, features in enumerate(documents):
+        for feature, count in features.items():
+            column, sign = hashed[feature]
+            idf = math.log((1 + total) / (1 + document_frequency[feature])) + 1
+            vectors[row, column] += sign * (1 + math.log(count)) * idf
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def find_neighbors(vectors, neighbors):
+    """
+    Find the most cosine-similar rows of every row, comparing blocks of rows against the whole matrix.
+
+    @param vectors: ndarray : L2-normalized row vectors
+    @param neighbors: int : Number of neighbors to keep per row
+
+    @return: ndarray : Neighbor row indices of every row, most similar first
+    """
+    total = len(vectors)
+    neighbors = min(neighbors, total - 1)
+    indices = np.zeros((total, max(neighbors, 0)), dtype=np.int64)
+    if neighbors <= 0:
+        return indices
+
+    for start in range(0, total, SIMILARITY_BLOCK_SIZE):
+        block = vectors[start:start + SIMILARITY_BLOCK_SIZE] @ vectors.T
+        rows = np.arange(len(block))
+        block[rows, rows + start] = -np.inf
+
+        best = np.argpartition(-block, neighbors - 1, axis=1)[:, :neighbors]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        indices[start:start + len(block)] = np.take_along_axis(best, order, axis=1)
+    return indices
+
+
+def build_similar_rentals(neighbors=20, batch_size=1000):
+    """
+    Precompute the nearest active rentals of every active rental and write the neighbor table
+    to SIMILAR_RENTALS_PATH.
+
+    @param neighbors: int : Number of neighbors stored per rental
+    @param batch_size: int : Number of rentals read per query
+
+    @return: int : Number of rentals in the table
+    """
+    rentals = Rental.objects.filter(status=True, verified=True).order_by('id').only(
+        'id', 'title', 'description', 'tags_mask', 'property_type', 'city', 'price')
+    rental_ids = []
+    documents = []
+    for rental in rentals.iterator(chunk_size=batch_size):
+        rental_ids.append(rental.id)
+        documents.append(get_rental_features(rental))
+
+    rental_ids = np.array(rental_ids, dtype=np.int64)
+    indices = find_neighbors(build_vectors(documents), neighbors)
+
+    path = settings.SIMILAR_RENTALS_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.tmp', 'wb') as table_file:
+        np.savez(table_file, ids=rental_ids, neighbors=rental_ids[indices])
+    os.replace(f'{path}.tmp', path)
+    return len(rental_ids)
+
+
+class NeighborTable:
+    def __init__(self, path):
+        with np.load(path) as table:
+            self.ids = table['ids']
+            self.neighbors = table['neighbors']
+
+    def get_neighbor_ids(self, rental_id):
+        position = np.searchsorted(self.ids, rental_id)
+        if position == len(self.ids) or self.ids[position] != rental_id:
+            return []
+        return self.neighbors[position].tolist()
+
+
+_table = None
+_table_mtime = None
+_lock = threading.Lock()
+
+
+def get_similar_rental_ids(rental_id):
+    """
+    Look up the precomputed neighbors of a rental, reloading the table when the build job has replaced it.
+
+    @param rental_id: int : ID of the rental
+
+    @return: list : IDs of similar rentals, most similar first
+    """
+    global _table, _table_mtime
+
+    try:
+        mtime = os.stat(settings.SIMILAR_RENTALS_PATH).st_mtime
+    except FileNotFoundError:
+        return []
+
+    if mtime != _table_mtime:
+        with _lock:
+            if mtime != _table_mtime:
+                _table = NeighborTable(settings.SIMILAR_RENTALS_PATH)
+                _table_mtime = mtime
+    return _table.get_neighbor_ids(rental_id)
@@ -0,0 +1,63 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import F
+
+from apps.rentals.choices.rental_choice import TagChoices
+
+# Bit positions follow the declaration order of TagChoices; append new tags at the end to keep stored masks valid
+TAG_BITS = {name: 1 << position for position, name in enumerate(TagChoices.values)}
+
+
+def get_tags_mask(tag_names):
+    mask = 0
+    for name in tag_names:
+        mask |= TAG_BITS.get(name, 0)
+    return mask
+
+
+def get_tag_names(mask):
+    return [name for name, bit in TAG_BITS.items() if mask & bit]
+
+
+def get_matching_tags_mask(term):
+    # Mirrors the former tags__name__icontains filter: every tag containing the term matches
+    term = term.strip().casefold()
+    return get_tags_mask(name for name in TAG_BITS if term in name.casefold())
+
+
+def calculate_tags_masks(through_rows):
+    """
+    Build the tag bitmask of each rental from (rental_id, tag name) rows of the Rental.tags through table.
+
+    @param through_rows: iterable : (rental_id, tag name) pairs
+
+    @return: dict : Rental ID mapped to its tag bitmask
+    """
+    masks = defaultdict(int)
+    for rental_id, tag_name in through_rows:
+        masks[rental_id] |= TAG_BITS.get(tag_name, 0)
+    return masks
+
+
+def filter_by_tags(queryset, terms, match_any=False):
+    """
+    Filter rentals by tags with bitwise predicates on tags_mask instead of joins through the tags table.
+
+    @param queryset: QuerySet : Rentals to filter
+    @param terms: list : Tag names or parts of them; each term matches every tag containing it
+    @param match_any: bool : Require at least one term to match instead of all of them
+
+    @return: QuerySet : Rentals having the requested tags
+    """
+    masks = [get_matching_tags_mask(term) for term in terms]
+    if match_any:
+        masks = [reduce(or_, masks)]
+    if not all(masks):
+        return queryset.none()
+
+    for index, mask in enumerate(masks):
+        alias = f'tags_match_{index}'
+        queryset = queryset.alias(**{alias: F('tags_mask').bitand(mask)}).exclude(**{alias: 0})
+    return queryset
@@ -0,0 +1,124 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.rentals.models.rental_model import Rental
+from apps.search_and_filters.utils.search_cache_utils import bump_catalog_generation
+from apps.view_history.utils.view_event_utils import record_view_event
+
+# IDs of rentals with views not yet written to the database
+PENDING_VIEWS_KEY = 'rental_views:pending'
+
+
+def get_views_key(rental_id):
+    return f'rental_views:{rental_id}'
+
+
+def record_rental_view(rental_id, viewer):
+    """
+    Count a view of a rental in Redis, at most once per viewer within RENTAL_VIEW_DEDUP_SECONDS.
+
+    @param rental_id: int : ID of the viewed rental
+    @param viewer: int | str : User ID of an authenticated viewer, IP address otherwise
+
+    @return: tuple : Whether the view was counted, and the views of the rental not yet written to views_count
+    """
+    connection = get_redis_connection('default')
+    seen_key = f'rental_view_{rental_id}_{viewer}'
+    if not connection.set(seen_key, 1, nx=True, ex=settings.RENTAL_VIEW_DEDUP_SECONDS):
+        return False, int(connection.get(get_views_key(rental_id)) or 0)
+
+    pipeline = connection.pipeline(transaction=False)
+    pipeline.incr(get_views_key(rental_id))
+    pipeline.sadd(PENDING_VIEWS_KEY, rental_id)
+    pending, _ = pipeline.execute()
+    return True, pending
+
+
+def pop_pending_rental_ids(batch_size):
+    rental_ids = get_redis_connection('default').spop(PENDING_VIEWS_KEY, batch_size)
+    return [int(rental_id) for rental_id in rental_ids or []]
+
+
+def release_pending_views(deltas):
+    """
+    Subtract flushed views from the counters once they are committed. Views counted while
+    the flush ran stay in the counter and the rental is queued for the next flush.
+    """
+    connection = get_redis_connection('default')
+    pipeline = connection.pipeline(transaction=False)
+    for rental_id, delta in deltas.items():
+        pipeline.incr(get_views_key(rental_id), -delta)
+    remaining = pipeline.execute()
+
+    requeued = [rental_id for rental_id, pending in zip(deltas, remaining) if pending > 0]
+    if requeued:
+        connection.sadd(PENDING_VIEWS_KEY, *requeued)
+
+
+def increment_views(rental, user, ip_address):
+    """
+    Count a view of a rental without writing to the database, and add the views not yet flushed
+    to the rental's views_count so the response shows the current total. Every counted view is also
+    queued as a view history event, so the rollups agree with views_count.
+
+    Falls back to updating views_count directly when Redis is unavailable.
+
+    @param rental: Rental : Viewed rental
+    @param user: User : User making the request, possibly anonymous
+    @param ip_address: str : Client IP address, identifies anonymous viewers
+
+    @return: None
+    """
+    viewer = user.id if user.is_authenticated else ip_address
+    try:
+        counted, pending = record_rental_view(rental.id, viewer)
+        rental.views_count += pending
+    except RedisError:
+        Rental.objects.filter(id=rental.id).update(views_count=F('views_count') + 1)
+        rental.views_count += 1
+        counted = True
+
+    if counted:
+        record_view_event(rental.id, user, ip_address)
+
+
+def flush_rental_views(batch_size=1000):
+    """
+    Add the views counted in Redis to Rental.views_count, one UPDATE per distinct delta in each batch.
+
+    @param batch_size: int : Number of rentals flushed per transaction
+
+    @return: int : Number of views written
+    """
+    connection = get_redis_connection('default')
+    flushed = 0
+    while True:
+        rental_ids = pop_pending_rental_ids(batch_size)
+        if not rental_ids:
+            if flushed:
+                # Views filters and sorts read views_count, and queryset updates send no signals
+                bump_catalog_generation()
+            return flushed
+
+        values = connection.mget([get_views_key(rental_id) for rental_id in rental_ids])
+        deltas = {rental_id: int(value) for rental_id, value in zip(rental_ids, values) if value and int(value) > 0}
+        by_delta = defaultdict(list)
+        for rental_id, delta in deltas.items():
+            by_delta[delta].append(rental_id)
+
+        # F() updates leave updated_at alone, so view counts don't mark rentals as edited
+        try:
+            with transaction.atomic():
+                for delta, ids in by_delta.items():
+                    Rental.objects.filter(id__in=ids).update(views_count=F('views_count') + delta)
+        except DatabaseError:
+            # The counters are only decremented after a commit, the rentals just have to be queued again
+            connection.sadd(PENDING_VIEWS_KEY, *rental_ids)
+            raise
+        release_pending_views(deltas)
+        flushed += sum(deltas.values())
@@ -15,7 +15,8 @@ class PendingRentalViewSet(viewsets.ModelViewSet):
     @serializer_class: RentalSerializer : Serializer : Rental serializer
     @permission_classes: [IsModeratorOrSuperUser] : List : Permissions required to access the view
     """
-    queryset = Rental.objects.filter(verified=False, rejected=False).order_by('-updated_at')
+    queryset = RentalSerializer.setup_eager_loading(
+        Rental.objects.filter(verified=False, rejected=False).order_by('-updated_at'))
     serializer_class = RentalSerializer
     permission_classes = [IsModeratorOrSuperUser]
 
@@ -59,7 +60,8 @@ def pending_rentals_list(request):
 
    @return: JsonResponse : JSON response with detailed information of pending rentals
    """
-    rentals = Rental.objects.filter(verified=False, rejected=False).order_by('-created_at')
+    rentals = RentalSerializer.setup_eager_loading(
+        Rental.objects.filter(verified=False, rejected=False).order_by('-created_at'))
     serializer = RentalSerializer(rentals, many=True)
     return JsonResponse(serializer.data, safe=False)
 
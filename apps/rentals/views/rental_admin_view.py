@@ -1,8 +1,13 @@
-from rest_framework import viewsets
+import codecs
+
+from django.contrib.auth import get_user_model
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from apps.rentals.models.rental_model import Rental
 from apps.rentals.serializers.rental_serializer import RentalSerializer
+from apps.rentals.utils.rental_import_utils import get_import_format, import_rentals
 from apps.core.permissions.moderator_or_super import IsModeratorOrSuperUser
 
 
@@ -26,7 +31,7 @@ class RentalAdminViewSet(viewsets.ModelViewSet):
 
         @return: QuerySet : All rentals
         """
-        return Rental.objects.all()
+        return RentalSerializer.setup_eager_loading(Rental.objects.all())
 
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
@@ -42,3 +47,40 @@ class RentalAdminViewSet(viewsets.ModelViewSet):
         rental.verified = True
         rental.save()
         return Response({'status': 'approved'})
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_rentals(self, request):
+        """
+        Import rentals from an uploaded CSV or JSON Lines file, see import_rentals in rental_import_utils.
+
+        @param request: Request : Multipart request with `file`, and optionally `format`, `user` (ID of the owner,
+            the requesting user by default) and `verified`
+
+        @return: Response : Number of imported rentals, the errors of the rows that failed and an `error`
+            when the file could not be read to the end
+        """
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'error': 'No file was uploaded.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            file_format = get_import_format(file.name, request.data.get('format'))
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        if request.data.get('user'):
+            if not str(request.data['user']).isdigit():
+                return Response({'error': 'User must be a user ID.'}, status=status.HTTP_400_BAD_REQUEST)
+            user = get_user_model().objects.filter(id=request.data['user']).first()
+            if user is None:
+                return Response({'error': 'User not found.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        verified = str(request.data.get('verified', '')).lower() in ('1', 'true')
+        result = import_rentals(codecs.getreader('utf-8-sig')(file), file_format, user, verified=verified)
+        if result['created']:
+            response_status = status.HTTP_201_CREATED
+        elif 'error' in result:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(result, status=response_status)
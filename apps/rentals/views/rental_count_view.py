@@ -2,9 +2,10 @@ from django.shortcuts import get_object_or_404
 from django.http import HttpResponse
 
 from apps.rentals.models.rental_model import Rental
+from apps.rentals.utils.view_counter_utils import increment_views
 
 
 def view_rental(request, rental_id):
     rental = get_object_or_404(Rental, id=rental_id)
-    rental.increment_views()
+    increment_views(rental, request.user, request.META.get('REMOTE_ADDR'))
     return HttpResponse(f"This rental has been viewed {rental.views_count} times.")
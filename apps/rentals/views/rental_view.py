@@ -8,24 +8,29 @@ from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.pagination.keyset_pagination import KeysetPaginationMixin
 from apps.rentals.models.rental_model import Rental
 from apps.rentals.models.image_rental_model import Image
 from apps.rentals.models.tag_model import Tag
 from apps.rentals.serializers.rental_serializer import RentalSerializer
+from apps.rentals.utils.image_derivative_utils import schedule_image_derivatives
+from apps.rentals.utils.similarity_utils import get_similar_rental_ids
+from apps.rentals.utils.view_counter_utils import increment_views
 
 
-class RentalViewSet(viewsets.ModelViewSet):
+class RentalViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """
     Handles CRUD operations for rental properties.
 
-    @queryset: Rental.objects.with_average_rating().order_by('average_rating') : QuerySet : Rentals with average rating
+    @queryset: Rental.objects.order_by('average_rating') : QuerySet : Rentals ordered by average rating
     @serializer_class: RentalSerializer : Serializer : Rental serializer
     @permission_classes: [IsAuthenticatedOrReadOnly] : List : Permissions required to access the view
     @lookup_field: 'id' : str : Field used for lookup by viewset
-    @pagination_class: PageNumberPagination : Pagination : Pagination class used by the viewset
+    @pagination_class: PageNumberPagination : Pagination : Pagination class used by the viewset,
+        KeysetPagination with `?pagination=cursor`
     """
 
-    queryset = Rental.objects.with_average_rating().order_by('average_rating')
+    queryset = Rental.objects.order_by('average_rating')
     serializer_class = RentalSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'id'
@@ -39,7 +44,7 @@ class RentalViewSet(viewsets.ModelViewSet):
 
         @return: QuerySet : Filtered rentals based on user's permissions and rental status
         """
-        queryset = Rental.objects.with_average_rating().order_by('-created_at')
+        queryset = RentalSerializer.setup_eager_loading(Rental.objects.order_by('-created_at', '-id'))
         user = self.request.user
 
         if user.is_anonymous:
@@ -50,6 +55,17 @@ class RentalViewSet(viewsets.ModelViewSet):
 
         return queryset.filter(Q(status=True, verified=True) | Q(user=user))
 
+    def get_serializer_context(self):
+        """
+        Rental lists show image thumbnails, a single rental the original images.
+
+        @return: dict : Serializer context, with `image_size` for list actions
+        """
+        context = super().get_serializer_context()
+        if self.action in ('list', 'similar'):
+            context['image_size'] = 'thumbnail'
+        return context
+
     def perform_create(self, serializer):
         """
         Handle the creation of a new rental property, including adding tags and images.
@@ -66,9 +82,11 @@ class RentalViewSet(viewsets.ModelViewSet):
             tags = [Tag.objects.get_or_create(name=tag_name)[0] for tag_name in tags_data]
             rental.tags.set(tags)
 
-            for index, image in enumerate(additional_images_data):
-                Image.objects.create(rental=rental, image=image,
-                                     is_main=(index == 0))
+            images = [
+                Image.objects.create(rental=rental, image=image, is_main=(index == 0))
+                for index, image in enumerate(additional_images_data)
+            ]
+            schedule_image_derivatives(images)
 
             rental.save()
 
@@ -112,8 +130,8 @@ class RentalViewSet(viewsets.ModelViewSet):
                 rental.tags.set(tags)
 
             if additional_images_data:
-                for image in additional_images_data:
-                    Image.objects.create(rental=rental, image=image)
+                schedule_image_derivatives(
+                    Image.objects.create(rental=rental, image=image) for image in additional_images_data)
 
             if main_image_id:
                 rental.images.update(is_main=False)
@@ -157,7 +175,7 @@ class RentalViewSet(viewsets.ModelViewSet):
         """
         instance = self.get_object()
         ip_address = request.META.get('REMOTE_ADDR')
-        instance.increment_views(request.user, ip_address)
+        increment_views(instance, request.user, ip_address)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -173,10 +191,35 @@ class RentalViewSet(viewsets.ModelViewSet):
         """
         rental = self.get_object()
         ip_address = request.META.get('REMOTE_ADDR')
-        rental.increment_views(request.user, ip_address)
+        increment_views(rental, request.user, ip_address)
         serializer = self.get_serializer(rental)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def similar(self, request, id=None):
+        """
+        Custom action to list the active rentals most similar to a rental property, from the neighbor table
+        built by the build_similar_rentals command.
+
+        @param request: Request : Request object, `limit` sets the number of rentals (10 by default)
+        @param id: str : ID of the rental property
+
+        @return: Response : JSON response with the serialized similar rentals, most similar first
+        """
+        try:
+            limit = int(request.GET.get('limit', 10))
+        except ValueError:
+            return Response({'detail': 'Invalid limit parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        rental = self.get_object()
+        neighbor_ids = get_similar_rental_ids(rental.id)
+        rentals = RentalSerializer.setup_eager_loading(
+            Rental.objects.filter(id__in=neighbor_ids, status=True, verified=True)).in_bulk()
+        similar_rentals = [rentals[rental_id] for rental_id in neighbor_ids if rental_id in rentals][:max(limit, 0)]
+
+        serializer = self.get_serializer(similar_rentals, many=True)
+        return Response(serializer.data)
+
     @action(detail=True, methods=['delete'], permission_classes=[IsAuthenticated], parser_classes=[JSONParser])
     def remove_images(self, request, id=None):
         """
@@ -6,6 +6,7 @@ urlpatterns = [
     path('search/', include('apps.search_and_filters.urls')),
     path('bookings/', include('apps.bookings.urls')),
     path('reviews/', include('apps.reviews.urls')),
+    path('view-history/', include('apps.view_history.urls')),
 ]
 
 # urlpatterns = [
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.search_and_filters.models.saved_search_model import SavedSearch, SavedSearchMatch
 from apps.search_and_filters.models.search_model import SearchHistory, UserSearchHistory
 
 
@@ -19,3 +20,21 @@ class UserSearchHistoryAdmin(admin.ModelAdmin):
 
 
 admin.site.register(UserSearchHistory, UserSearchHistoryAdmin)
+
+
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'created_at')
+    search_fields = ('name', 'user__username')
+    readonly_fields = ('created_at',)
+
+
+admin.site.register(SavedSearch, SavedSearchAdmin)
+
+
+class SavedSearchMatchAdmin(admin.ModelAdmin):
+    list_display = ('saved_search', 'rental', 'seen', 'created_at')
+    list_filter = ('seen', 'created_at')
+    readonly_fields = ('created_at',)
+
+
+admin.site.register(SavedSearchMatch, SavedSearchMatchAdmin)
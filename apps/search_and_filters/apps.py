@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SearchAndFilterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.search_and_filters'
+
+    def ready(self):
+        import apps.search_and_filters.signals.search_index_signal
+        import apps.search_and_filters.signals.search_cache_signal
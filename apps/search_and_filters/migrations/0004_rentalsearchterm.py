@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0003_initial_tags'),
+        ('search_and_filters', '0003_remove_searchhistory_asdfasfd'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentalSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('title_frequency', models.PositiveIntegerField(default=0)),
+                ('description_frequency', models.PositiveIntegerField(default=0)),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='rentals.rental')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'rental'], name='search_term_rental_idx')],
+            },
+        ),
+    ]
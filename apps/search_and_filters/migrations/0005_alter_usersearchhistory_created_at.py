@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search_and_filters', '0004_rentalsearchterm'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usersearchhistory',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search_and_filters', '0005_alter_usersearchhistory_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rentalsearchterm',
+            name='document_length',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search_and_filters', '0006_rentalsearchterm_document_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchhistory',
+            name='normalized_query',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
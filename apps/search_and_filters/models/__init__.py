@@ -0,0 +1 @@
+from .saved_search_model import SavedSearch, SavedSearchMatch
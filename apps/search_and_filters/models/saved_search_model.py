@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db import models
+
+from apps.rentals.models.rental_model import Rental
+
+
+class SavedSearch(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100)
+    # Query and filters in the canonical form of normalize_search_params
+    params = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.name}"
+
+
+class SavedSearchMatch(models.Model):
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='saved_search_matches')
+    seen = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['saved_search', 'rental'], name='unique_saved_search_match'),
+        ]
+
+    def __str__(self):
+        return f"{self.saved_search.name} - {self.rental.title}"
@@ -0,0 +1,20 @@
+from django.db import models
+
+from apps.rentals.models.rental_model import Rental
+
+
+class RentalSearchTerm(models.Model):
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=64)
+    title_frequency = models.PositiveIntegerField(default=0)
+    description_frequency = models.PositiveIntegerField(default=0)
+    # Token count of the rental's title and description, repeated on every posting for BM25 length normalization
+    document_length = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'rental'], name='search_term_rental_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} - {self.rental_id}"
@@ -1,12 +1,22 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from apps.search_and_filters.utils.search_query_utils import normalize_query
 
 
 class SearchHistory(models.Model):
     search_query = models.CharField(max_length=255, unique=True)
+    # Canonical form of the query, see normalize_query. Null for rows recorded before normalization
+    # until the merge_search_history_duplicates command has run
+    normalized_query = models.CharField(max_length=255, unique=True, null=True, blank=True, editable=False)
     search_count = models.IntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        self.normalized_query = normalize_query(self.search_query)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.search_query} - {self.search_count}"
 
@@ -14,7 +24,8 @@ class SearchHistory(models.Model):
 class UserSearchHistory(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     search_history = models.ForeignKey(SearchHistory, on_delete=models.CASCADE)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set explicitly by the buffered recorder so the entry keeps the time of the search, not of the flush
+    created_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return f"{self.user.username} - {self.search_history.search_query}"
@@ -0,0 +1,26 @@
+from rest_framework import serializers
+
+from apps.rentals.serializers.rental_serializer import RentalSerializer
+from apps.search_and_filters.models.saved_search_model import SavedSearch, SavedSearchMatch
+from apps.search_and_filters.utils.saved_search_utils import normalize_saved_search_params
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedSearch
+        fields = ['id', 'user', 'name', 'params', 'created_at']
+        read_only_fields = ['id', 'user', 'created_at']
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Params must be an object of search filters.")
+        return normalize_saved_search_params(value)
+
+
+class SavedSearchMatchSerializer(serializers.ModelSerializer):
+    rental = RentalSerializer(read_only=True)
+
+    class Meta:
+        model = SavedSearchMatch
+        fields = ['id', 'saved_search', 'rental', 'seen', 'created_at']
+        read_only_fields = fields
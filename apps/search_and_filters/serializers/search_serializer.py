@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from apps.search_and_filters.models.search_model import SearchHistory, UserSearchHistory
+from apps.search_and_filters.utils.search_query_utils import normalize_query
 
 
 class SearchHistorySerializer(serializers.ModelSerializer):
@@ -8,6 +9,14 @@ class SearchHistorySerializer(serializers.ModelSerializer):
         fields = ['id', 'search_query', 'created_at', 'search_count']
         read_only_fields = ['id', 'created_at', 'search_count']
 
+    def validate_search_query(self, value):
+        duplicates = SearchHistory.objects.filter(normalized_query=normalize_query(value))
+        if self.instance:
+            duplicates = duplicates.exclude(id=self.instance.id)
+        if duplicates.exists():
+            raise serializers.ValidationError("Search history with an equivalent query already exists.")
+        return value
+
 
 class UserSearchHistorySerializer(serializers.ModelSerializer):
     search_query = serializers.CharField(source='search_history.search_query', read_only=True)
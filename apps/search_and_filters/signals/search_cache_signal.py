@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.bookings.models.booking_model import Booking
+from apps.rentals.models.rental_model import Rental
+from apps.search_and_filters.utils.search_cache_utils import bump_catalog_generation
+
+
+@receiver(post_save, sender=Rental)
+def invalidate_search_cache_on_save(sender, instance, **kwargs):
+    bump_catalog_generation()
+
+
+@receiver(post_delete, sender=Rental)
+def invalidate_search_cache_on_delete(sender, instance, **kwargs):
+    bump_catalog_generation()
+
+
+@receiver(m2m_changed, sender=Rental.tags.through)
+def invalidate_search_cache_on_tags_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_generation()
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_search_cache_on_booking_change(sender, instance, **kwargs):
+    # Bookings decide which rentals the check_in/check_out filter returns
+    bump_catalog_generation()
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.rentals.models.rental_model import Rental
+from apps.search_and_filters.utils.search_index_utils import index_rental, INDEXED_FIELDS
+
+
+@receiver(post_save, sender=Rental)
+def update_search_index_on_save(sender, instance, update_fields=None, **kwargs):
+    # Index rows are removed together with the rental through the CASCADE foreign key
+    if update_fields and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    index_rental(instance)
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+
+from apps.rentals.models.rental_model import Rental
+from apps.search_and_filters.models.search_model import SearchHistory
+
+# Suggestions for prefixes up to this length are precomputed, longer prefixes select few enough keys to scan
+PRECOMPUTED_PREFIX_LENGTH = 3
+MAX_SUGGESTIONS = 20
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    """
+    Immutable in-memory prefix index over weighted suggestions.
+
+    Keys are kept in one sorted list, so the suggestions for a prefix form a contiguous range found
+    with two binary searches. A key may lead to several suggestions (e.g. the last word of several titles).
+    The best suggestions of short prefixes, whose ranges can be large, are computed once when the index is built.
+    """
+
+    def __init__(self, suggestions):
+        weights = {}
+        for key, text, kind, weight in suggestions:
+            key = key.casefold()
+            if key:
+                weights[key, text, kind] = max(weight, weights.get((key, text, kind), weight))
+
+        pairs = sorted(weights.items())
+        self.keys = [key for (key, _, _), _ in pairs]
+        self.entries = [(text, kind, weight) for (_, text, kind), weight in pairs]
+        self.top = {}
+
+        prefixes = {}
+        for key, entry in zip(self.keys, self.entries):
+            for length in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                prefixes.setdefault(key[:length], []).append(entry)
+        for prefix, prefix_entries in prefixes.items():
+            self.top[prefix] = self.best(prefix_entries, MAX_SUGGESTIONS)
+
+    @staticmethod
+    def best(entries, limit):
+        # The same text may be reachable through several keys (e.g. words of a title), it is shown once
+        suggestions, seen = [], set()
+        for text, kind, _ in sorted(entries, key=lambda entry: entry[2], reverse=True):
+            if text.casefold() not in seen:
+                seen.add(text.casefold())
+                suggestions.append({'text': text, 'type': kind})
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
+    def search(self, prefix, limit=10):
+        prefix = ' '.join(prefix.casefold().split())
+        limit = min(limit, MAX_SUGGESTIONS)
+        if not prefix:
+            return []
+        if prefix in self.top:
+            return self.top[prefix][:limit]
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo=start)
+        return self.best(self.entries[start:end], limit)
+
+
+def load_suggestions():
+    rentals = Rental.objects.filter(status=True, verified=True)
+
+    for title, views_count in rentals.values_list('title', 'views_count').iterator():
+        words = title.split()
+        # Index the title from every word so "loft" also suggests "Cozy Berlin loft"
+        for position in range(len(words)):
+            yield ' '.join(words[position:]), title, 'rental', views_count
+
+    for field in ('city', 'country'):
+        for value, total in rentals.values_list(field).annotate(total=Count('id')).order_by():
+            yield value, value, field, total
+
+    queries = SearchHistory.objects.order_by('-search_count').values_list('search_query', 'search_count')
+    for search_query, search_count in queries[:settings.AUTOCOMPLETE_MAX_QUERIES]:
+        yield search_query, search_query, 'query', search_count
+
+
+_index = PrefixIndex([])
+_built_at = None
+# Held by the thread rebuilding the index
+_rebuild_lock = threading.Lock()
+
+
+def rebuild_autocomplete_index():
+    """
+    Build this process's prefix index from the catalog and popular queries and swap it in.
+
+    @return: PrefixIndex : New prefix index
+    """
+    global _index, _built_at
+
+    index = PrefixIndex(load_suggestions())
+    _index, _built_at = index, time.monotonic()
+    return index
+
+
+def rebuild_in_background():
+    # Runs in its own thread, which keeps its own database connection
+    try:
+        rebuild_autocomplete_index()
+    except Exception:
+        logger.exception('Could not rebuild the autocomplete index')
+    finally:
+        connection.close()
+        _rebuild_lock.release()
+
+
+def get_autocomplete_index():
+    """
+    Return this process's prefix index, starting a background rebuild when it is older than
+    AUTOCOMPLETE_REBUILD_INTERVAL.
+
+    Requests never wait for a rebuild: they answer from the previous index, or from an empty one
+    until the first build of the process has finished.
+
+    @return: PrefixIndex : Current prefix index
+    """
+    stale = _built_at is None or time.monotonic() - _built_at >= settings.AUTOCOMPLETE_REBUILD_INTERVAL
+    if stale and _rebuild_lock.acquire(blocking=False):
+        threading.Thread(target=rebuild_in_background, name='autocomplete-index', daemon=True).start()
+    return _index
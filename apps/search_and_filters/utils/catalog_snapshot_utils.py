@@ -0,0 +1,208 @@
+import json
+import os
+import shutil
+import threading
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.rentals.models.rental_model import Rental
+
+CURRENT_FILE = 'current.json'
+# Only columns whose writers save the rental, and so bump updated_at, are snapshotted: get_snapshot_filter
+# relies on updated_at to find rentals changed since the build. View counts, ratings, review counts and
+# tags_mask are updated in place and stay with the SQL filters.
+NUMERIC_COLUMNS = {
+    'id': np.int64,
+    'price': np.float64,
+    'rooms': np.int64,
+}
+# Text columns are stored as codes into a per-snapshot vocabulary of folded values
+TEXT_COLUMNS = ['location', 'city', 'country', 'property_type']
+# Filter name -> (column, comparison) for the range filters the snapshot prefilters on
+RANGE_FILTERS = {
+    'min_price': ('price', np.greater_equal),
+    'max_price': ('price', np.less_equal),
+    'rooms': ('rooms', np.equal),
+}
+
+
+def fold_text(value):
+    # Case- and accent-insensitive like the database collation, so the snapshot never drops a SQL match
+    decomposed = unicodedata.normalize('NFKD', (value or '').casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def get_snapshot_dir():
+    return Path(settings.SEARCH_SNAPSHOT_DIR)
+
+
+def build_catalog_snapshot(batch_size=1000):
+    """
+    Write the filterable columns of active, verified rentals to a new snapshot directory
+    and point current.json at it.
+
+    @param batch_size: int : Number of rentals read per query
+
+    @return: int : Number of rentals in the snapshot
+    """
+    # Taken before reading so rentals changed during the build are treated as changed since the snapshot
+    built_at = timezone.now()
+    columns = {name: [] for name in [*NUMERIC_COLUMNS, *TEXT_COLUMNS]}
+    vocabularies = {name: {} for name in TEXT_COLUMNS}
+
+    rentals = Rental.objects.filter(status=True, verified=True).order_by('id').values_list(*columns)
+    for row in rentals.iterator(chunk_size=batch_size):
+        for name, value in zip(columns, row):
+            if name in vocabularies:
+                value = vocabularies[name].setdefault(fold_text(value), len(vocabularies[name]))
+            columns[name].append(value)
+
+    snapshot_dir = get_snapshot_dir()
+    path = snapshot_dir / built_at.strftime('%Y%m%d%H%M%S%f')
+    path.mkdir(parents=True)
+    for name, values in columns.items():
+        dtype = NUMERIC_COLUMNS.get(name, np.int32)
+        np.save(path / f'{name}.npy', np.array(values, dtype=dtype))
+    with open(path / 'meta.json', 'w') as meta_file:
+        json.dump({
+            'built_at': built_at.isoformat(),
+            'vocabularies': {name: list(vocabulary) for name, vocabulary in vocabularies.items()},
+        }, meta_file)
+
+    # Readers only ever see a complete snapshot: the pointer is swapped atomically
+    pointer = snapshot_dir / f'{CURRENT_FILE}.tmp'
+    with open(pointer, 'w') as pointer_file:
+        json.dump({'path': path.name}, pointer_file)
+    os.replace(pointer, snapshot_dir / CURRENT_FILE)
+
+    # Keep the previous snapshot for workers that have not reloaded yet
+    previous = sorted(entry for entry in snapshot_dir.iterdir() if entry.is_dir() and entry.name != path.name)
+    for entry in previous[:-1]:
+        shutil.rmtree(entry, ignore_errors=True)
+    return len(columns['id'])
+
+
+class CatalogSnapshot:
+    """
+    Read-only view of a snapshot directory. Columns are memory-mapped, so every worker process
+    on the host shares the same pages of the OS page cache.
+    """
+
+    def __init__(self, path):
+        with open(path / 'meta.json') as meta_file:
+            meta = json.load(meta_file)
+        self.built_at = parse_datetime(meta['built_at'])
+        self.vocabularies = meta['vocabularies']
+        self.columns = {
+            name: np.load(path / f'{name}.npy', mmap_mode='r') for name in [*NUMERIC_COLUMNS, *TEXT_COLUMNS]
+        }
+
+    def get_text_mask(self, name, terms, exact=False):
+        mask = np.ones(len(self.columns['id']), dtype=bool)
+        for term in terms:
+            term = fold_text(term)
+            codes = [
+                code for code, value in enumerate(self.vocabularies[name])
+                if (value == term if exact else term in value)
+            ]
+            mask &= np.isin(self.columns[name], codes)
+        return mask
+
+    def get_matching_ids(self, filters):
+        """
+        Evaluate the numeric and categorical search filters as vectorized masks over the snapshot.
+
+        @param filters: dict : Filters returned by get_search_filters
+
+        @return: ndarray : IDs of matching rentals, or None when no filter can be answered by the snapshot
+        """
+        mask = np.ones(len(self.columns['id']), dtype=bool)
+        applied = False
+
+        for name, (column, compare) in RANGE_FILTERS.items():
+            if filters[name]:
+                try:
+                    value = float(filters[name])
+                except ValueError:
+                    return None
+                mask &= compare(self.columns[column], value)
+                applied = True
+
+        for name in ('location', 'city'):
+            if filters[name]:
+                mask &= self.get_text_mask(name, filters[name])
+                applied = True
+        if filters['country']:
+            mask &= self.get_text_mask('country', [filters['country']])
+            applied = True
+        if filters['property_type']:
+            mask &= self.get_text_mask('property_type', filters['property_type'], exact=True)
+            applied = True
+
+        if not applied:
+            return None
+        return self.columns['id'][mask]
+
+
+_snapshot = None
+_snapshot_mtime = None
+_lock = threading.Lock()
+
+
+def get_catalog_snapshot():
+    """
+    Return the current catalog snapshot, reloading it when current.json has been replaced.
+
+    @return: CatalogSnapshot : The loaded snapshot, or None when there is no usable snapshot
+    """
+    global _snapshot, _snapshot_mtime
+
+    pointer = get_snapshot_dir() / CURRENT_FILE
+    try:
+        mtime = pointer.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    if mtime != _snapshot_mtime:
+        with _lock:
+            if mtime != _snapshot_mtime:
+                with open(pointer) as pointer_file:
+                    path = get_snapshot_dir() / json.load(pointer_file)['path']
+                _snapshot = CatalogSnapshot(path)
+                _snapshot_mtime = mtime
+
+    # A snapshot the rebuild job has stopped refreshing is not trusted
+    if (timezone.now() - _snapshot.built_at).total_seconds() > settings.SEARCH_SNAPSHOT_MAX_AGE:
+        return None
+    return _snapshot
+
+
+def get_snapshot_filter(filters):
+    """
+    Narrow a search to candidates from the catalog snapshot before the SQL filters run.
+
+    Rentals created or edited since the snapshot was built are always kept as candidates,
+    the SQL filters remain the source of truth for every candidate.
+
+    @param filters: dict : Filters returned by get_search_filters
+
+    @return: Q : Candidate ID condition, or None when the snapshot can't narrow the search
+    """
+    if not settings.SEARCH_SNAPSHOT_MAX_CANDIDATES:
+        return None
+    snapshot = get_catalog_snapshot()
+    if snapshot is None:
+        return None
+
+    candidate_ids = snapshot.get_matching_ids(filters)
+    if candidate_ids is None or len(candidate_ids) > settings.SEARCH_SNAPSHOT_MAX_CANDIDATES:
+        return None
+
+    changed_ids = Rental.objects.filter(updated_at__gte=snapshot.built_at).values_list('id', flat=True)
+    return Q(id__in={*candidate_ids.tolist(), *changed_ids})
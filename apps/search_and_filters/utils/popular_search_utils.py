@@ -0,0 +1,144 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.search_and_filters.models.search_model import SearchHistory, UserSearchHistory
+from apps.search_and_filters.utils.search_query_utils import MAX_QUERY_LENGTH, normalize_query
+
+POPULAR_SEARCHES_KEY = 'popular_searches'
+ALL_TIME_KEY = f'{POPULAR_SEARCHES_KEY}:all'
+ALL_TIME_SEEDED_KEY = f'{POPULAR_SEARCHES_KEY}:all:seeded'
+# Window name -> (bucket length in seconds, number of buckets the window spans)
+WINDOWS = {
+    'hour': (600, 6),
+    'day': (3600, 24),
+    'week': (86400, 7),
+}
+POPULAR_SEARCH_WINDOWS = ['all', *WINDOWS]
+# Latest spelling of each normalized query is kept as long as the longest window's buckets
+SPELLING_TIMEOUT = max(seconds * (buckets + 1) for seconds, buckets in WINDOWS.values())
+
+
+def get_bucket_key(window, bucket):
+    return f'{POPULAR_SEARCHES_KEY}:{window}:{bucket}'
+
+
+def get_spelling_key(normalized_query):
+    return f'{POPULAR_SEARCHES_KEY}:spelling:{normalized_query}'
+
+
+def track_search(pipeline, query, timestamp=None):
+    """
+    Count a search in the all-time and per-window sorted sets under its normalized query,
+    and remember how it was typed for display.
+
+    @param pipeline: Pipeline : Redis pipeline the commands are queued on
+    @param query: str : Search query as typed
+    @param timestamp: float : Unix time of the search, now by default
+
+    @return: None
+    """
+    timestamp = timestamp or time.time()
+    normalized_query = normalize_query(query)
+    pipeline.zincrby(ALL_TIME_KEY, 1, normalized_query)
+    for window, (seconds, buckets) in WINDOWS.items():
+        key = get_bucket_key(window, int(timestamp // seconds))
+        pipeline.zincrby(key, 1, normalized_query)
+        pipeline.expire(key, seconds * (buckets + 1))
+    pipeline.set(get_spelling_key(normalized_query), ' '.join(query.split())[:MAX_QUERY_LENGTH], ex=SPELLING_TIMEOUT)
+
+
+def seed_all_time_searches(redis):
+    # Counts recorded before the tracker existed only live in the database
+    if not redis.set(ALL_TIME_SEEDED_KEY, 1, nx=True):
+        return
+    counts = Counter()
+    rows = SearchHistory.objects.order_by('-search_count').values_list('search_query', 'search_count')
+    for search_query, search_count in rows[:settings.POPULAR_SEARCHES_TRACKED]:
+        counts[normalize_query(search_query)] += search_count
+    if counts:
+        redis.zadd(ALL_TIME_KEY, counts, gt=True)
+
+
+def get_window_key(redis, window):
+    key = f'{POPULAR_SEARCHES_KEY}:{window}:top'
+    if redis.exists(key):
+        return key
+
+    seconds, buckets = WINDOWS[window]
+    current = int(time.time() // seconds)
+    pipeline = redis.pipeline(transaction=True)
+    pipeline.zunionstore(key, [get_bucket_key(window, current - offset) for offset in range(buckets)])
+    pipeline.zremrangebyrank(key, 0, -settings.POPULAR_SEARCHES_TRACKED - 1)
+    pipeline.expire(key, settings.POPULAR_SEARCHES_CACHE_TIMEOUT)
+    pipeline.execute()
+    return key
+
+
+def get_popular_searches_from_db(window, limit):
+    if window == 'all':
+        return list(SearchHistory.objects.values('search_query').annotate(
+            total=Sum('search_count')).order_by('-total')[:limit])
+
+    seconds, buckets = WINDOWS[window]
+    since = timezone.now() - timedelta(seconds=seconds * buckets)
+    return list(UserSearchHistory.objects.filter(created_at__gte=since).values(
+        search_query=F('search_history__search_query')).annotate(total=Count('id')).order_by('-total')[:limit])
+
+
+def get_display_queries(redis, normalized_queries):
+    """
+    @param redis: Redis : Connection the spellings are read from
+    @param normalized_queries: list : Normalized queries of the tracker's sorted sets
+
+    @return: list : Latest spelling of each query, the stored search history spelling when it has expired
+    """
+    spellings = redis.mget([get_spelling_key(query) for query in normalized_queries]) if normalized_queries else []
+    display_queries = dict(zip(normalized_queries, [spelling and spelling.decode() for spelling in spellings]))
+
+    # Queries seeded from the database or not searched for a while
+    missing = [query for query, spelling in display_queries.items() if not spelling]
+    if missing:
+        rows = SearchHistory.objects.filter(normalized_query__in=missing).values_list('normalized_query', 'search_query')
+        for normalized_query, search_query in rows:
+            display_queries[normalized_query] = search_query
+    return [display_queries[query] or query for query in normalized_queries]
+
+
+def get_popular_searches(window='all', limit=10):
+    """
+    Return the most frequent search queries of all time or of the last hour, day or week.
+
+    Reads the tracker's sorted sets and falls back to the database when Redis is unavailable.
+
+    @param window: str : One of POPULAR_SEARCH_WINDOWS
+    @param limit: int : Number of queries to return
+
+    @return: list : Dicts with `search_query` and `total`, most frequent first
+    """
+    try:
+        redis = get_redis_connection('default')
+        if window == 'all':
+            seed_all_time_searches(redis)
+            key = ALL_TIME_KEY
+        else:
+            key = get_window_key(redis, window)
+        rows = redis.zrevrange(key, 0, limit - 1, withscores=True)
+        display_queries = get_display_queries(redis, [query.decode() for query, _ in rows])
+    except RedisError:
+        return get_popular_searches_from_db(window, limit)
+    return [
+        {'search_query': display_query, 'total': int(total)}
+        for display_query, (_, total) in zip(display_queries, rows)
+    ]
+
+
+def trim_popular_searches():
+    redis = get_redis_connection('default')
+    return redis.zremrangebyrank(ALL_TIME_KEY, 0, -settings.POPULAR_SEARCHES_TRACKED - 1)
@@ -0,0 +1,248 @@
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+from rest_framework.exceptions import ValidationError
+
+from apps.bookings.models.booked_night_model import BookedNight
+from apps.rentals.models.rental_model import Rental
+from apps.rentals.utils.geo_utils import haversine_km
+from apps.rentals.utils.tag_mask_utils import get_matching_tags_mask
+from apps.search_and_filters.models.saved_search_model import SavedSearch, SavedSearchMatch
+from apps.search_and_filters.utils.search_export_utils import iterate_in_chunks
+from apps.search_and_filters.utils.search_filter_utils import (
+    RANGE_FILTERS,
+    get_search_filters,
+    normalize_search_params,
+    parse_bounding_box_filter,
+    parse_radius_filter,
+    parse_stay_filter,
+)
+from apps.search_and_filters.utils.search_index_utils import MIN_PREFIX_LENGTH, has_rental_with_every_term, tokenize
+
+MATCHER_LAST_RUN_KEY = 'saved_search_matcher:last_run'
+# How far back the first run, or a run after the marker was lost, looks for new rentals
+MATCHER_DEFAULT_LOOKBACK = timedelta(days=1)
+MATCHED_RENTAL_FIELDS = [
+    'id', 'user_id', 'title', 'description', 'location', 'city', 'country', 'price', 'rooms', 'property_type',
+    'views_count', 'reviews_count', 'average_rating', 'tags_mask', 'latitude', 'longitude',
+    'availability_start_date', 'availability_end_date',
+]
+
+
+def get_params_filters(params):
+    values = MultiValueDict({
+        name: [str(item) for item in value] if isinstance(value, list) else [str(value)]
+        for name, value in params.items()
+    })
+    return (values.get('q') or '').strip(), get_search_filters(values)
+
+
+class SavedSearchFilter:
+    """
+    A saved search compiled into in-memory checks with the same semantics as apply_search_filters.
+
+    Like search_rentals, query terms must all match, or any of them when no rental contains them all
+    (`every_term`, decided by the caller against the index).
+    """
+
+    def __init__(self, saved_search_id, user_id, params):
+        query, filters = get_params_filters(params)
+        self.saved_search_id = saved_search_id
+        self.user_id = user_id
+        self.terms = list(dict.fromkeys(tokenize(query)))
+        self.every_term = True
+
+        self.ranges = []
+        for name, (field, compare) in RANGE_FILTERS.items():
+            if filters[name]:
+                try:
+                    self.ranges.append((field, compare, float(filters[name])))
+                except ValueError:
+                    raise ValidationError({'detail': f'{name} must be a number.'})
+
+        self.contains = [(field, term.casefold()) for field in ('location', 'city') for term in filters[field]]
+        if filters['country']:
+            self.contains.append(('country', filters['country'].casefold()))
+        self.property_types = {property_type.casefold() for property_type in filters['property_type']}
+
+        self.tags_masks = [get_matching_tags_mask(term) for term in filters['tags']]
+        if self.tags_masks and filters['tags_mode'] == 'any':
+            self.tags_masks = [reduce(or_, self.tags_masks)]
+
+        has_radius = filters['lat'] or filters['lng'] or filters['radius']
+        self.radius = parse_radius_filter(filters) if has_radius else None
+        self.bbox = parse_bounding_box_filter(filters) if filters['bbox'] else None
+        has_stay = filters['check_in'] or filters['check_out']
+        self.stay = parse_stay_filter(filters) if has_stay else None
+
+    @staticmethod
+    def matches_term(term, tokens):
+        if len(term) >= MIN_PREFIX_LENGTH:
+            return any(token.startswith(term) for token in tokens)
+        return term in tokens
+
+    def matches_terms(self, tokens):
+        if not self.terms:
+            return True
+        check = all if self.every_term else any
+        return check(self.matches_term(term, tokens) for term in self.terms)
+
+    def matches_location(self, rental):
+        if rental.latitude is None or rental.longitude is None:
+            return False
+        if self.radius:
+            latitude, longitude, radius = self.radius
+            if haversine_km(latitude, longitude, rental.latitude, rental.longitude) > radius:
+                return False
+        if self.bbox:
+            min_lat, min_lng, max_lat, max_lng = self.bbox
+            if not (min_lat <= rental.latitude <= max_lat and min_lng <= rental.longitude <= max_lng):
+                return False
+        return True
+
+    def matches_stay(self, rental, booked_dates):
+        check_in, check_out = self.stay
+        if rental.availability_start_date and rental.availability_start_date > check_in:
+            return False
+        if rental.availability_end_date and rental.availability_end_date < check_out:
+            return False
+        return not any(check_in <= date < check_out for date in booked_dates)
+
+    def matches(self, rental, tokens, booked_dates):
+        if rental.user_id == self.user_id:
+            return False
+        if any(property_type != rental.property_type.casefold() for property_type in self.property_types):
+            return False
+        if any(not compare(float(getattr(rental, field)), value) for field, compare, value in self.ranges):
+            return False
+        if any(term not in (getattr(rental, field) or '').casefold() for field, term in self.contains):
+            return False
+        if any(not rental.tags_mask & mask for mask in self.tags_masks):
+            return False
+        if (self.radius or self.bbox) and not self.matches_location(rental):
+            return False
+        if self.stay and not self.matches_stay(rental, booked_dates):
+            return False
+        return self.matches_terms(tokens)
+
+
+class SavedSearchIndex:
+    """
+    Saved searches indexed by their query terms, so a rental is only checked against the searches
+    sharing a term with its title or description. Searches without a query are bucketed by property
+    type, a rental is checked against its own bucket and the searches without one.
+    """
+
+    def __init__(self, saved_filters):
+        # Terms shorter than MIN_PREFIX_LENGTH match whole tokens, longer ones token prefixes
+        self.exact_terms = defaultdict(list)
+        self.prefix_terms = defaultdict(list)
+        self.without_terms = defaultdict(list)
+        self.count = 0
+        self.earliest_check_in = None
+        for saved_filter in saved_filters:
+            # Property type filters are combined with AND, two different ones can never match
+            if len(saved_filter.property_types) > 1:
+                continue
+            for term in saved_filter.terms:
+                term_index = self.prefix_terms if len(term) >= MIN_PREFIX_LENGTH else self.exact_terms
+                term_index[term].append(saved_filter)
+            if not saved_filter.terms:
+                self.without_terms[next(iter(saved_filter.property_types), None)].append(saved_filter)
+            self.count += 1
+            if saved_filter.stay and (not self.earliest_check_in or saved_filter.stay[0] < self.earliest_check_in):
+                self.earliest_check_in = saved_filter.stay[0]
+
+    def __len__(self):
+        return self.count
+
+    def get_candidates(self, rental, tokens):
+        candidates = {}
+        for token in tokens:
+            for saved_filter in self.exact_terms.get(token, []):
+                candidates[saved_filter.saved_search_id] = saved_filter
+            for length in range(MIN_PREFIX_LENGTH, len(token) + 1):
+                for saved_filter in self.prefix_terms.get(token[:length], []):
+                    candidates[saved_filter.saved_search_id] = saved_filter
+        for property_type in (rental.property_type.casefold(), None):
+            for saved_filter in self.without_terms.get(property_type, []):
+                candidates[saved_filter.saved_search_id] = saved_filter
+        return candidates.values()
+
+    def match(self, rental, booked_dates):
+        tokens = set(tokenize(rental.title)) | set(tokenize(rental.description))
+        return [
+            saved_filter.saved_search_id for saved_filter in self.get_candidates(rental, tokens)
+            if saved_filter.matches(rental, tokens, booked_dates)
+        ]
+
+
+def normalize_saved_search_params(params):
+    """
+    Validate saved search parameters and bring them into the canonical form stored on SavedSearch.
+
+    @param params: dict : Search query `q` and filters as accepted by SearchViewSet
+
+    @return: dict : Normalized parameters
+    """
+    query, filters = get_params_filters(params)
+    normalized = normalize_search_params(query, filters)
+    SavedSearchFilter(None, None, normalized)
+    return normalized
+
+
+def load_saved_search_index():
+    saved_filters = []
+    # Saved searches often share a query, the index is asked once per distinct set of terms
+    every_term = {}
+    for saved_search_id, user_id, params in SavedSearch.objects.values_list('id', 'user_id', 'params').iterator():
+        try:
+            saved_filter = SavedSearchFilter(saved_search_id, user_id, params)
+        except ValidationError:
+            continue
+        terms = tuple(saved_filter.terms)
+        if terms not in every_term:
+            every_term[terms] = has_rental_with_every_term(saved_filter.terms)
+        saved_filter.every_term = every_term[terms]
+        saved_filters.append(saved_filter)
+    return SavedSearchIndex(saved_filters)
+
+
+def match_saved_searches(batch_size=500):
+    """
+    Record matches between saved searches and rentals created, verified or edited since the previous run.
+
+    @param batch_size: int : Number of rentals read per query
+
+    @return: int : Number of matches found, including ones recorded by an earlier run
+    """
+    started_at = timezone.now()
+    since = cache.get(MATCHER_LAST_RUN_KEY) or started_at - MATCHER_DEFAULT_LOOKBACK
+    index = load_saved_search_index()
+
+    matched = 0
+    if len(index):
+        rentals = Rental.objects.filter(status=True, verified=True, updated_at__gte=since).only(*MATCHED_RENTAL_FIELDS)
+        for chunk in iterate_in_chunks(rentals, batch_size):
+            booked_dates = defaultdict(set)
+            if index.earliest_check_in:
+                booked_nights = BookedNight.objects.filter(
+                    rental_id__in=[rental.id for rental in chunk], date__gte=index.earliest_check_in)
+                for rental_id, date in booked_nights.values_list('rental_id', 'date'):
+                    booked_dates[rental_id].add(date)
+
+            matches = [
+                SavedSearchMatch(saved_search_id=saved_search_id, rental_id=rental.id)
+                for rental in chunk for saved_search_id in index.match(rental, booked_dates[rental.id])
+            ]
+            # A rental edited after it matched is seen again, the constraint keeps one match per pair
+            SavedSearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+            matched += len(matches)
+
+    cache.set(MATCHER_LAST_RUN_KEY, started_at, None)
+    return matched
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.search_and_filters.utils.search_filter_utils import get_search_cache_key
+
+GENERATION_KEY = 'search_catalog_generation'
+
+
+def get_catalog_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Start from a timestamp so a lost counter never reuses an old generation
+        cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_catalog_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def get_versioned_cache_key(prefix, params):
+    return get_search_cache_key(prefix, {'generation': get_catalog_generation(), **params})
+
+
+def get_cached_search_page(params):
+    return cache.get(get_versioned_cache_key('search_results', params))
+
+
+def set_cached_search_page(params, rental_ids, count):
+    cache.set(
+        get_versioned_cache_key('search_results', params),
+        {'ids': rental_ids, 'count': count},
+        timeout=settings.SEARCH_RESULTS_CACHE_TIMEOUT
+    )
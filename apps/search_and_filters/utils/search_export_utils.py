@@ -0,0 +1,29 @@
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    """
+    Yield a queryset as lists of at most chunk_size objects, walking the primary key instead of OFFSET.
+
+    Every chunk is a separate query, so prefetch_related runs per chunk and memory use stays flat
+    even on backends whose iterator() buffers the whole result set on the client (MySQL).
+
+    @param queryset: QuerySet : Objects to read, any ordering is replaced by the primary key
+    @param chunk_size: int : Number of objects per query
+
+    @return: generator : Lists of objects
+    """
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id).order_by('id')[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def stream_ndjson(queryset, serializer_class, context, chunk_size):
+    encoder = JSONEncoder(ensure_ascii=False)
+    for chunk in iterate_in_chunks(queryset, chunk_size):
+        rows = serializer_class(chunk, many=True, context=context).data
+        yield ''.join(f'{encoder.encode(row)}\n' for row in rows)
@@ -0,0 +1,69 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.rentals.utils.tag_mask_utils import get_tag_names
+
+from apps.search_and_filters.utils.search_cache_utils import get_versioned_cache_key
+
+# (label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = [
+    ('0-50', 0, 50),
+    ('50-100', 50, 100),
+    ('100-200', 100, 200),
+    ('200-500', 200, 500),
+    ('500+', 500, None),
+]
+
+
+def get_price_bucket(price):
+    for label, lower, upper in PRICE_BUCKETS:
+        if price >= lower and (upper is None or price < upper):
+            return label
+    return None
+
+
+def count_facets(queryset):
+    """
+    Count property types, cities, countries, tags and price buckets of the given rentals.
+
+    A single query returns one row per rental; tag counts are read from the tags bitmask.
+
+    @param queryset: QuerySet : Filtered rentals
+
+    @return: dict : Facet name mapped to a {value: count} dictionary
+    """
+    property_types, cities, countries, tags, prices = Counter(), Counter(), Counter(), Counter(), Counter()
+    total = 0
+    rows = queryset.order_by().values_list('property_type', 'city', 'country', 'price', 'tags_mask')
+
+    for property_type, city, country, price, tags_mask in rows.iterator():
+        total += 1
+        tags.update(get_tag_names(tags_mask))
+        property_types[property_type] += 1
+        cities[city] += 1
+        countries[country] += 1
+        prices[get_price_bucket(price)] += 1
+
+    return {
+        'total': total,
+        'property_type': dict(property_types.most_common()),
+        'city': dict(cities.most_common()),
+        'country': dict(countries.most_common()),
+        'tags': dict(tags.most_common()),
+        'price': {label: prices[label] for label, lower, upper in PRICE_BUCKETS},
+    }
+
+
+def get_facets(queryset, params):
+    timeout = settings.SEARCH_FACETS_CACHE_TIMEOUT
+    if not timeout:
+        return count_facets(queryset)
+
+    cache_key = get_versioned_cache_key('search_facets', params)
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = count_facets(queryset)
+        cache.set(cache_key, facets, timeout=timeout)
+    return facets
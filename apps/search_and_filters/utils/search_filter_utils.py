@@ -0,0 +1,182 @@
+import hashlib
+import json
+import operator
+from datetime import datetime
+
+from rest_framework.exceptions import ValidationError
+
+from apps.bookings.utils.occupancy_utils import filter_available
+from apps.rentals.utils.geo_utils import filter_within_radius, filter_within_bounding_box
+from apps.rentals.utils.tag_mask_utils import filter_by_tags
+from apps.search_and_filters.utils.catalog_snapshot_utils import get_snapshot_filter
+from apps.search_and_filters.utils.search_index_utils import search_rentals
+
+SORT_FIELDS = {
+    'created_at': 'created_at',
+    'min_price': 'price',
+    'max_price': '-price',
+    'min_rating': 'average_rating',
+    'max_rating': '-average_rating',
+    'top_rated': '-rating_score',
+    'min_reviews': 'reviews_count',
+    'max_reviews': '-reviews_count',
+    'min_views': 'views_count',
+    'max_views': '-views_count'
+}
+
+# Numeric filter name -> (rental field, comparison), for matching rentals against filters outside SQL
+RANGE_FILTERS = {
+    'min_price': ('price', operator.ge),
+    'max_price': ('price', operator.le),
+    'rooms': ('rooms', operator.eq),
+    'min_views': ('views_count', operator.ge),
+    'max_views': ('views_count', operator.le),
+    'min_rating': ('average_rating', operator.ge),
+    'max_rating': ('average_rating', operator.le),
+    'min_reviews': ('reviews_count', operator.ge),
+    'max_reviews': ('reviews_count', operator.le),
+}
+
+LIST_FILTERS = ['location', 'city', 'property_type', 'tags']
+VALUE_FILTERS = [
+    'min_price', 'max_price', 'country', 'rooms', 'min_views', 'max_views', 'min_rating', 'max_rating',
+    'min_reviews', 'max_reviews', 'lat', 'lng', 'radius', 'bbox',
+    'check_in', 'check_out', 'tags_mode'
+]
+
+
+def get_search_filters(params):
+    filters = {name: params.getlist(name) for name in LIST_FILTERS}
+    filters.update({name: params.get(name) for name in VALUE_FILTERS})
+    return filters
+
+
+def get_sort_field(sort_by, sort_order):
+    sort_by_field = SORT_FIELDS.get(sort_by, 'created_at')
+    if sort_order == 'desc':
+        sort_by_field = '-' + sort_by_field.lstrip('-')
+    return sort_by_field
+
+
+def parse_radius_filter(filters):
+    try:
+        latitude, longitude, radius = float(filters['lat']), float(filters['lng']), float(filters['radius'])
+    except (TypeError, ValueError):
+        raise ValidationError({'detail': 'lat, lng and radius (km) must all be numbers.'})
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180 and radius > 0):
+        raise ValidationError({'detail': 'lat, lng or radius is out of range.'})
+    return latitude, longitude, radius
+
+
+def parse_bounding_box_filter(filters):
+    try:
+        min_lat, min_lng, max_lat, max_lng = [float(value) for value in filters['bbox'].split(',')]
+    except ValueError:
+        raise ValidationError({'detail': 'bbox must be min_lat,min_lng,max_lat,max_lng.'})
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+        raise ValidationError({'detail': 'bbox is out of range.'})
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def parse_stay_filter(filters):
+    try:
+        check_in = datetime.strptime(filters['check_in'] or '', '%Y-%m-%d').date()
+        check_out = datetime.strptime(filters['check_out'] or '', '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError({'detail': 'check_in and check_out must both be dates in YYYY-MM-DD format.'})
+    if check_in >= check_out:
+        raise ValidationError({'detail': 'check_out must be after check_in.'})
+    return check_in, check_out
+
+
+def normalize_search_params(query, filters, **extra):
+    """
+    Build a canonical representation of a search so equivalent requests share cache entries.
+
+    @param query: str : Raw search query
+    @param filters: dict : Filters returned by get_search_filters
+    @param extra: dict : Additional parameters that affect the result (sorting, page)
+
+    @return: dict : Canonical search parameters without empty values
+    """
+    normalized = {'q': ' '.join(query.casefold().split())} if query else {}
+    for name, value in filters.items():
+        if isinstance(value, list):
+            values = sorted({item.strip().casefold() for item in value if item.strip()})
+            if values:
+                normalized[name] = values
+        elif value not in (None, ''):
+            normalized[name] = value.strip()
+    normalized.update({name: value for name, value in extra.items() if value not in (None, '')})
+    return normalized
+
+
+def get_search_cache_key(prefix, params):
+    digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def apply_search_filters(queryset, query, filters, matches=None):
+    """
+    Narrow a rental queryset down by the search query and filters.
+
+    @param queryset: QuerySet : Rentals to filter
+    @param query: str : Free-text search query
+    @param filters: dict : Filters returned by get_search_filters
+    @param matches: SearchMatches : Index matches of the query when already resolved by the caller
+
+    @return: QuerySet : Filtered rentals
+    """
+    results = queryset
+
+    # Numeric and categorical filters first narrow the search to candidates from the catalog snapshot
+    snapshot_filter = get_snapshot_filter(filters)
+    if snapshot_filter is not None:
+        results = results.filter(snapshot_filter)
+
+    # Поиск по ключевым словам в тайтле и описании через инвертированный индекс
+    if query:
+        if matches is None:
+            matches = search_rentals(query)
+        results = results.filter(matches.condition)
+
+    # Применение фильтров
+    if filters['min_price']:
+        results = results.filter(price__gte=filters['min_price'])
+    if filters['max_price']:
+        results = results.filter(price__lte=filters['max_price'])
+    if filters['location']:
+        for location in filters['location']:
+            results = results.filter(location__icontains=location)
+    if filters['city']:
+        for city in filters['city']:
+            results = results.filter(city__icontains=city)
+    if filters['country']:
+        results = results.filter(country__icontains=filters['country'])
+    if filters['rooms']:
+        results = results.filter(rooms=filters['rooms'])
+    if filters['property_type']:
+        for property_type in filters['property_type']:
+            results = results.filter(property_type__iexact=property_type)
+    if filters['tags']:
+        results = filter_by_tags(results, filters['tags'], match_any=filters['tags_mode'] == 'any')
+    if filters['min_views']:
+        results = results.filter(views_count__gte=filters['min_views'])
+    if filters['max_views']:
+        results = results.filter(views_count__lte=filters['max_views'])
+    if filters['min_rating']:
+        results = results.filter(average_rating__gte=filters['min_rating'])
+    if filters['max_rating']:
+        results = results.filter(average_rating__lte=filters['max_rating'])
+    if filters['min_reviews']:
+        results = results.filter(reviews_count__gte=filters['min_reviews'])
+    if filters['max_reviews']:
+        results = results.filter(reviews_count__lte=filters['max_reviews'])
+    if filters['lat'] or filters['lng'] or filters['radius']:
+        results = filter_within_radius(results, *parse_radius_filter(filters))
+    if filters['bbox']:
+        results = filter_within_bounding_box(results, *parse_bounding_box_filter(filters))
+    if filters['check_in'] or filters['check_out']:
+        results = filter_available(results, *parse_stay_filter(filters))
+
+    return results
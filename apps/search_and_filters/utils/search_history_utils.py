@@ -0,0 +1,161 @@
+import json
+from collections import Counter, defaultdict
+
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.search_and_filters.models.search_model import SearchHistory, UserSearchHistory
+from apps.search_and_filters.utils.popular_search_utils import track_search
+from apps.search_and_filters.utils.search_query_utils import MAX_QUERY_LENGTH, normalize_query
+
+SEARCH_EVENTS_KEY = 'search_history:events'
+
+
+def record_search(user_id, query):
+    """
+    Queue a search event for the next flush instead of writing search history on the request path,
+    and count it in the popular searches tracker right away.
+
+    Falls back to writing the event immediately when Redis is unavailable.
+
+    @param user_id: int : ID of the user performing the search
+    @param query: str : Search query
+
+    @return: None
+    """
+    searched_at = timezone.now()
+    event = {'user_id': user_id, 'query': query, 'searched_at': searched_at.isoformat()}
+    try:
+        pipeline = get_redis_connection('default').pipeline(transaction=False)
+        pipeline.rpush(SEARCH_EVENTS_KEY, json.dumps(event))
+        track_search(pipeline, query, searched_at.timestamp())
+        pipeline.execute()
+    except RedisError:
+        apply_search_events([event])
+
+
+def pop_search_events(batch_size):
+    pipeline = get_redis_connection('default').pipeline(transaction=True)
+    pipeline.lrange(SEARCH_EVENTS_KEY, 0, batch_size - 1)
+    pipeline.ltrim(SEARCH_EVENTS_KEY, batch_size, -1)
+    events, _ = pipeline.execute()
+    return [json.loads(event) for event in events]
+
+
+def requeue_search_events(events):
+    # Back at the head of the queue in their original order, for the next flush
+    get_redis_connection('default').lpush(SEARCH_EVENTS_KEY, *[json.dumps(event) for event in reversed(events)])
+
+
+def get_history_ids(queries):
+    history_ids = dict(
+        SearchHistory.objects.filter(normalized_query__in=queries).values_list('normalized_query', 'id')
+    )
+
+    # Rows recorded before normalization have no key yet, they block the insert through their raw query
+    missing = [query for normalized_query, query in queries.items() if normalized_query not in history_ids]
+    if missing:
+        legacy = SearchHistory.objects.filter(normalized_query__isnull=True, search_query__in=missing)
+        for search_query, history_id in legacy.values_list('search_query', 'id'):
+            normalized_query = normalize_query(search_query)
+            if normalized_query in queries and normalized_query not in history_ids:
+                SearchHistory.objects.filter(id=history_id).update(normalized_query=normalized_query)
+                history_ids[normalized_query] = history_id
+    return history_ids
+
+
+def apply_search_events(events):
+    normalized_queries = [normalize_query(event['query']) for event in events]
+    counts = Counter(normalized_queries)
+    # The first spelling seen is kept for display
+    queries = {}
+    for normalized_query, event in zip(normalized_queries, events):
+        queries.setdefault(normalized_query, event['query'][:MAX_QUERY_LENGTH])
+
+    with transaction.atomic():
+        SearchHistory.objects.bulk_create(
+            [
+                SearchHistory(search_query=query, normalized_query=normalized_query, search_count=0)
+                for normalized_query, query in queries.items()
+            ],
+            ignore_conflicts=True
+        )
+        history_ids = get_history_ids(queries)
+
+        # One UPDATE per distinct increment keeps counts exact under concurrent flushes
+        ids_by_increment = defaultdict(list)
+        for normalized_query, count in counts.items():
+            if normalized_query in history_ids:
+                ids_by_increment[count].append(history_ids[normalized_query])
+        for increment, ids in ids_by_increment.items():
+            SearchHistory.objects.filter(id__in=ids).update(search_count=F('search_count') + increment)
+
+        UserSearchHistory.objects.bulk_create([
+            UserSearchHistory(
+                user_id=event['user_id'],
+                search_history_id=history_ids[normalized_query],
+                created_at=parse_datetime(event['searched_at'])
+            )
+            for normalized_query, event in zip(normalized_queries, events) if normalized_query in history_ids
+        ])
+
+
+def merge_search_history_duplicates(batch_size=1000):
+    """
+    Merge search history rows whose queries normalize to the same key and store the key on every row.
+
+    The oldest row of each group is kept with the summed count, user history entries of the other
+    rows are moved to it before they are deleted.
+
+    @param batch_size: int : Number of rows read and written per query
+
+    @return: int : Number of deleted duplicate rows
+    """
+    with transaction.atomic():
+        survivors = {}
+        duplicates = defaultdict(list)
+        changed = {}
+        rows = SearchHistory.objects.select_for_update().order_by('id').values_list(
+            'id', 'search_query', 'normalized_query', 'search_count')
+        for history_id, search_query, stored_query, search_count in rows.iterator(chunk_size=batch_size):
+            normalized_query = normalize_query(search_query)
+            survivor = survivors.get(normalized_query)
+            if survivor is None:
+                survivor = survivors[normalized_query] = SearchHistory(
+                    id=history_id, normalized_query=normalized_query, search_count=search_count)
+                if stored_query != normalized_query:
+                    changed[history_id] = survivor
+            else:
+                survivor.search_count += search_count
+                changed[survivor.id] = survivor
+                duplicates[survivor.id].append(history_id)
+
+        groups = list(duplicates.items())
+        for offset in range(0, len(groups), batch_size):
+            batch = groups[offset:offset + batch_size]
+            duplicate_ids = [history_id for _, ids in batch for history_id in ids]
+            UserSearchHistory.objects.filter(search_history_id__in=duplicate_ids).update(search_history_id=Case(
+                *[When(search_history_id__in=ids, then=Value(survivor_id)) for survivor_id, ids in batch]
+            ))
+            SearchHistory.objects.filter(id__in=duplicate_ids).delete()
+
+        SearchHistory.objects.bulk_update(changed.values(), ['normalized_query', 'search_count'], batch_size=batch_size)
+    return sum(len(ids) for ids in duplicates.values())
+
+
+def flush_search_history(batch_size=1000):
+    flushed = 0
+    while True:
+        events = pop_search_events(batch_size)
+        if not events:
+            return flushed
+        try:
+            apply_search_events(events)
+        except DatabaseError:
+            requeue_search_events(events)
+            raise
+        flushed += len(events)
@@ -0,0 +1,177 @@
+import re
+import time
+from collections import Counter, namedtuple
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from apps.rentals.models.rental_model import Rental
+from apps.search_and_filters.models.search_index_model import RentalSearchTerm
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+# Query terms shorter than this are matched exactly, longer ones as prefixes ("berl" -> "berlin")
+MIN_PREFIX_LENGTH = 3
+INDEXED_FIELDS = {'title', 'description', 'status', 'verified'}
+INDEX_STATS_KEY = 'search_index_stats'
+TERM_FREQUENCY_KEY = 'search_term_frequency'
+
+# Condition on Rental selecting the rentals matching a query, and the query's terms
+SearchMatches = namedtuple('SearchMatches', ['condition', 'terms'])
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(text.casefold())]
+
+
+def is_indexable(rental):
+    return rental.status and rental.verified
+
+
+def build_search_terms(rental):
+    title_tokens = tokenize(rental.title)
+    description_tokens = tokenize(rental.description)
+    title_counts = Counter(title_tokens)
+    description_counts = Counter(description_tokens)
+    document_length = len(title_tokens) + len(description_tokens)
+    return [
+        RentalSearchTerm(
+            rental_id=rental.pk,
+            term=term,
+            title_frequency=title_counts[term],
+            description_frequency=description_counts[term],
+            document_length=document_length,
+        )
+        for term in title_counts.keys() | description_counts.keys()
+    ]
+
+
+def index_rental(rental):
+    with transaction.atomic():
+        RentalSearchTerm.objects.filter(rental_id=rental.pk).delete()
+        if is_indexable(rental):
+            RentalSearchTerm.objects.bulk_create(build_search_terms(rental))
+
+
+def index_new_rentals(rentals):
+    # For rentals created with bulk_create, which sends no post_save signal and leaves nothing to delete
+    RentalSearchTerm.objects.bulk_create(
+        [term for rental in rentals if is_indexable(rental) for term in build_search_terms(rental)], batch_size=1000)
+
+
+def rebuild_search_index(batch_size=1000):
+    indexed = 0
+    with transaction.atomic():
+        RentalSearchTerm.objects.all().delete()
+        rentals = Rental.objects.filter(status=True, verified=True).only('id', 'title', 'description')
+        terms = []
+        for rental in rentals.iterator(chunk_size=batch_size):
+            terms.extend(build_search_terms(rental))
+            indexed += 1
+            if len(terms) >= batch_size:
+                RentalSearchTerm.objects.bulk_create(terms)
+                terms = []
+        RentalSearchTerm.objects.bulk_create(terms)
+    cache.delete(INDEX_STATS_KEY)
+    return indexed
+
+
+def get_term_filter(term):
+    if len(term) >= MIN_PREFIX_LENGTH:
+        return Q(term__startswith=term)
+    return Q(term=term)
+
+
+def get_postings(term):
+    return RentalSearchTerm.objects.filter(get_term_filter(term))
+
+
+def get_index_stats():
+    """
+    Return the number of indexed rentals and their average token length, cached between rebuilds.
+
+    @return: dict : `documents` and `average_length` of the search index, and the `version` of the statistics
+    """
+    stats = cache.get(INDEX_STATS_KEY)
+    if stats is None:
+        totals = RentalSearchTerm.objects.aggregate(
+            documents=Count('rental_id', distinct=True),
+            length=Sum(F('title_frequency') + F('description_frequency')),
+        )
+        documents = totals['documents'] or 0
+        stats = {
+            'documents': documents,
+            'average_length': (totals['length'] or 0) / documents if documents else 0.0,
+            # Term frequencies are cached per version, so they are recounted whenever the statistics are
+            'version': int(time.time() * 1000),
+        }
+        cache.set(INDEX_STATS_KEY, stats, settings.SEARCH_INDEX_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def get_document_frequency(term, stats):
+    """
+    Return the number of indexed rentals matching a query term, cached with the index statistics.
+
+    @param term: str : Query term, matched as a prefix when it is long enough
+    @param stats: dict : Index statistics returned by get_index_stats
+
+    @return: int : Number of distinct rentals with a posting for the term
+    """
+    key = f"{TERM_FREQUENCY_KEY}:{stats['version']}:{term}"
+    document_frequency = cache.get(key)
+    if document_frequency is None:
+        document_frequency = get_postings(term).values('rental_id').distinct().count()
+        # Unknown terms are cheap to count and may be indexed at any time, so only hits are cached
+        if document_frequency:
+            cache.set(key, document_frequency, settings.SEARCH_INDEX_STATS_CACHE_TIMEOUT)
+    return document_frequency
+
+
+def get_every_term_condition(terms):
+    condition = Q()
+    for term in terms:
+        condition &= Q(id__in=get_postings(term).values('rental_id'))
+    return condition
+
+
+def has_rental_with_every_term(terms):
+    """
+    Decide how search_rentals matches the terms: rentals containing every term, or any of them
+    when no rental contains them all.
+
+    @param terms: list : Distinct query terms
+
+    @return: bool : Whether some indexed rental contains every term
+    """
+    return len(terms) <= 1 or Rental.objects.filter(get_every_term_condition(terms)).exists()
+
+
+def search_rentals(query):
+    """
+    Resolve a free-text query through the inverted index.
+
+    Rentals containing every query term are matched; when no rental contains them all,
+    rentals matching any of the terms are matched instead. Posting lists stay in the database,
+    the matches are subqueries on the index.
+
+    @param query: str : Raw search query
+
+    @return: SearchMatches : Condition selecting the matching rentals and the query terms
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return SearchMatches(Q(pk__in=[]), [])
+
+    every_term = get_every_term_condition(terms)
+    if has_rental_with_every_term(terms):
+        return SearchMatches(every_term, terms)
+
+    any_term = reduce(or_, (get_term_filter(term) for term in terms))
+    return SearchMatches(Q(id__in=RentalSearchTerm.objects.filter(any_term).values('rental_id')), terms)
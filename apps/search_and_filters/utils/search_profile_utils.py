@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+def get_elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+class SearchProfiler:
+    """
+    Collects per-stage timings and every SQL statement executed while a search is profiled.
+
+    Use `with profiler:` around the whole search to capture queries and `with profiler.stage(name):`
+    around each step.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.queries = []
+        self.current_stage = None
+        self.started = None
+        self.wrapper = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.wrapper = connection.execute_wrapper(self)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wrapper.__exit__(*exc_info)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'stage': self.current_stage,
+                'sql': sql,
+                'params': [str(param) for param in params or []] if not many else [],
+                'duration_ms': get_elapsed_ms(started),
+            })
+
+    @contextmanager
+    def stage(self, name):
+        previous_stage, self.current_stage = self.current_stage, name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append({'name': name, 'duration_ms': get_elapsed_ms(started)})
+            self.current_stage = previous_stage
+
+    def get_report(self, **extra):
+        stages = [
+            {
+                **stage,
+                'query_count': sum(1 for query in self.queries if query['stage'] == stage['name']),
+                'query_time_ms': round(sum(
+                    query['duration_ms'] for query in self.queries if query['stage'] == stage['name']), 3),
+            }
+            for stage in self.stages
+        ]
+        return {
+            'total_ms': get_elapsed_ms(self.started),
+            'query_count': len(self.queries),
+            'query_time_ms': round(sum(query['duration_ms'] for query in self.queries), 3),
+            'stages': stages,
+            'queries': self.queries,
+            **extra,
+        }
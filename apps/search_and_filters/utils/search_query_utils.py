@@ -0,0 +1,27 @@
+from apps.search_and_filters.utils.search_index_utils import tokenize
+
+MAX_QUERY_LENGTH = 255
+# Words that do not change what a rental search is about, e.g. "flat in berlin" == "berlin flat"
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'at', 'by', 'for', 'from', 'in', 'near', 'of', 'on', 'or', 'the', 'to', 'with',
+    'в', 'и', 'к', 'на', 'о', 'около', 'по', 'рядом', 'с', 'у',
+})
+
+
+def normalize_query(query):
+    """
+    Reduce a search query to the canonical key its search history is counted under.
+
+    Case is folded, punctuation and repeated words dropped and the remaining words sorted,
+    so "Berlin  loft", "loft, berlin" and "a loft in Berlin" share one key.
+
+    @param query: str : Raw search query
+
+    @return: str : Normalized query
+    """
+    tokens = tokenize(query)
+    # A query made only of stop words keeps them, otherwise it would normalize to nothing
+    words = [token for token in tokens if token not in STOP_WORDS] or tokens
+    if not words:
+        return ' '.join(query.casefold().split())[:MAX_QUERY_LENGTH]
+    return ' '.join(sorted(set(words)))[:MAX_QUERY_LENGTH]
@@ -0,0 +1,61 @@
+import math
+
+from django.db.models import ExpressionWrapper, F, FloatField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.search_and_filters.utils.search_index_utils import (
+    get_document_frequency,
+    get_index_stats,
+    get_postings,
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A term occurrence in the title counts as much as this many occurrences in the description
+TITLE_WEIGHT = 3.0
+
+
+def get_term_score(term, stats):
+    """
+    Build the BM25 contribution of one query term as a subquery correlated to the rental.
+
+    @param term: str : Query term, matched as a prefix when it is long enough
+    @param stats: dict : Index statistics returned by get_index_stats
+
+    @return: Expression : The term's score for the outer rental, 0 for rentals without the term
+    """
+    document_frequency = get_document_frequency(term, stats)
+    if not document_frequency:
+        return Value(0.0)
+
+    # Statistics are cached separately, so the document count may briefly lag behind the term's frequency
+    documents = max(stats['documents'], document_frequency)
+    idf = math.log1p((documents - document_frequency + 0.5) / (document_frequency + 0.5))
+    average_length = stats['average_length'] or 1.0
+
+    # A prefix can expand to several indexed terms of one rental, their frequencies add up
+    frequency = Sum(Value(TITLE_WEIGHT) * F('title_frequency') + F('description_frequency'), output_field=FloatField())
+    norm = BM25_K1 * (1 - BM25_B) + Value(BM25_K1 * BM25_B / average_length) * Max('document_length')
+    score = ExpressionWrapper(Value(idf * (BM25_K1 + 1)) * frequency / (frequency + norm), output_field=FloatField())
+
+    postings = get_postings(term).filter(rental_id=OuterRef('pk')).values('rental_id')
+    return Coalesce(Subquery(postings.annotate(score=score).values('score')[:1]), Value(0.0))
+
+
+def rank_by_relevance(queryset, matches):
+    """
+    Annotate filtered rentals with their BM25 `relevance` for the search query.
+
+    Scores are computed by the database in the candidate query itself, so every candidate is ranked
+    and pagination orders by them directly.
+
+    @param queryset: QuerySet : Rentals already narrowed down by the query and filters
+    @param matches: SearchMatches : Index matches returned by search_rentals
+
+    @return: QuerySet : Rentals annotated with `relevance`
+    """
+    stats = get_index_stats()
+    relevance = Value(0.0, output_field=FloatField())
+    for term in matches.terms:
+        relevance = relevance + get_term_score(term, stats)
+    return queryset.annotate(relevance=ExpressionWrapper(relevance, output_field=FloatField()))
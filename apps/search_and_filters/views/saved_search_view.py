@@ -0,0 +1,78 @@
+from django.db.models import Prefetch
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.rentals.models.image_rental_model import Image
+from apps.search_and_filters.models.saved_search_model import SavedSearch
+from apps.search_and_filters.serializers.saved_search_serializer import (
+    SavedSearchSerializer,
+    SavedSearchMatchSerializer,
+)
+
+
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    """
+    Handles CRUD operations for the authenticated user's saved searches and the new rentals matched to them.
+
+    @serializer_class: SavedSearchSerializer : Serializer : Saved search serializer
+    @permission_classes: [IsAuthenticated] : List : Permissions required to access the view
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Retrieve the saved searches of the authenticated user.
+
+        @param self: SavedSearchViewSet : Instance of the viewset
+
+        @return: QuerySet : Saved searches of the user, newest first
+        """
+        return SavedSearch.objects.filter(user=self.request.user).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        """
+        Save a new saved search for the authenticated user.
+
+        @param serializer: SavedSearchSerializer : Serializer with the validated name and params
+
+        @return: None
+        """
+        serializer.save(user=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def matches(self, request, pk=None):
+        """
+        List rentals matched to the saved search by the match_saved_searches command, newest first.
+
+        @param request: Request : The request object, `unseen=1` limits the list to matches not marked as seen
+        @param pk: int : ID of the saved search
+
+        @return: Response : Paginated JSON response with the matches and their rentals
+        """
+        saved_search = self.get_object()
+        matches = saved_search.matches.select_related('rental__user').prefetch_related(
+            'rental__tags', Prefetch('rental__images', queryset=Image.objects.order_by('id'))
+        ).order_by('-created_at', '-id')
+        if request.GET.get('unseen') == '1':
+            matches = matches.filter(seen=False)
+
+        page = self.paginate_queryset(matches)
+        serializer = SavedSearchMatchSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def mark_seen(self, request, pk=None):
+        """
+        Mark all matches of the saved search as seen.
+
+        @param request: Request : The request object
+        @param pk: int : ID of the saved search
+
+        @return: Response : JSON response with the number of matches marked as seen
+        """
+        saved_search = self.get_object()
+        updated = saved_search.matches.filter(seen=False).update(seen=True)
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
@@ -1,10 +1,10 @@
-from django.db.models import Sum
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.search_and_filters.models.search_model import SearchHistory
+from apps.search_and_filters.utils.popular_search_utils import POPULAR_SEARCH_WINDOWS, get_popular_searches
 from apps.search_and_filters.serializers.search_serializer import SearchHistorySerializer
 
 
@@ -25,12 +25,15 @@ class SearchHistoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def popular_searches(self, request):
         """
-        Retrieve the top 10 popular search queries based on search count.
+        Retrieve the top 10 popular search queries of all time or of a recent time window.
 
-        @param request: Request : The request object containing the request data
+        @param request: Request : The request object containing an optional `window`: all, hour, day or week
 
         @return: Response : JSON response with the list of popular search queries and their counts
         """
-        popular_searches = SearchHistory.objects.values('search_query').annotate(
-            total=Sum('search_count')).order_by('-total')[:10]
+        window = request.GET.get('window', 'all')
+        if window not in POPULAR_SEARCH_WINDOWS:
+            return Response({'detail': 'Invalid window parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        popular_searches = get_popular_searches(window, limit=10)
         return Response(popular_searches, status=status.HTTP_200_OK)
@@ -1,4 +1,5 @@
-from django.db.models import Q, Case, When, IntegerField, Sum
+from django.conf import settings
+from django.http import StreamingHttpResponse
 
 from rest_framework import viewsets, status
 from rest_framework.response import Response
@@ -6,17 +7,34 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 
+from apps.core.pagination.keyset_pagination import KeysetPaginationMixin
+from apps.core.permissions.moderator_or_super import IsModeratorOrSuperUser
 from apps.rentals.models.rental_model import Rental
 from apps.rentals.serializers.rental_serializer import RentalSerializer
-from apps.search_and_filters.models.search_model import SearchHistory, UserSearchHistory
-
-
-class SearchViewSet(viewsets.ModelViewSet):
+from apps.search_and_filters.utils.autocomplete_utils import get_autocomplete_index
+from apps.search_and_filters.utils.popular_search_utils import POPULAR_SEARCH_WINDOWS, get_popular_searches
+from apps.search_and_filters.utils.search_cache_utils import get_cached_search_page, set_cached_search_page
+from apps.search_and_filters.utils.search_export_utils import stream_ndjson
+from apps.search_and_filters.utils.search_facet_utils import get_facets
+from apps.search_and_filters.utils.search_history_utils import record_search
+from apps.search_and_filters.utils.search_index_utils import search_rentals
+from apps.search_and_filters.utils.search_profile_utils import SearchProfiler
+from apps.search_and_filters.utils.search_ranking_utils import rank_by_relevance
+from apps.search_and_filters.utils.search_filter_utils import (
+    get_search_filters,
+    get_sort_field,
+    apply_search_filters,
+    normalize_search_params,
+)
+
+
+class SearchViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """
     Handles search operations for rental properties.
 
     @serializer_class: RentalSerializer : Serializer : Rental serializer
-    @pagination_class: PageNumberPagination : Pagination : Pagination class used by the viewset
+    @pagination_class: PageNumberPagination : Pagination : Pagination class used by the viewset,
+        KeysetPagination with `?pagination=cursor`
     @permission_classes: [IsAuthenticatedOrReadOnly] : List : Permissions required to access the view
     """
     serializer_class = RentalSerializer
@@ -29,133 +47,187 @@ class SearchViewSet(viewsets.ModelViewSet):
 
         @param self: SearchViewSet : Instance of the viewset
 
-        @return: QuerySet : Filtered and sorted rentals based on search query and applied filters
+        @return: QuerySet : Filtered rentals, ordered by BM25 relevance when there is a search query
+            and then by the requested sort
         """
-        queryset = Rental.objects.with_average_rating().filter(status=True, verified=True).order_by('-created_at')
+        queryset = RentalSerializer.setup_eager_loading(Rental.objects.filter(status=True, verified=True))
         query = self.request.GET.get('q', '').strip()
-        user = self.request.user
-
-        # Сохраняем поисковый запрос только если он не пустой и пользователь аутентифицирован
-        if query and user.is_authenticated:
-            search_history, created = SearchHistory.objects.get_or_create(search_query=query)
-            if created:
-                search_history.search_count = 1
-            else:
-                search_history.search_count += 1
-            search_history.save()
-            UserSearchHistory.objects.create(user=user, search_history=search_history)
-
-        filters = {
-            'min_price': self.request.GET.get('min_price'),
-            'max_price': self.request.GET.get('max_price'),
-            'location': self.request.GET.getlist('location'),
-            'city': self.request.GET.getlist('city'),
-            'country': self.request.GET.get('country'),
-            'rooms': self.request.GET.get('rooms'),
-            'property_type': self.request.GET.getlist('property_type'),
-            'tags': self.request.GET.getlist('tags'),
-            'min_views': self.request.GET.get('min_views'),
-            'max_views': self.request.GET.get('max_views'),
-            'min_rating': self.request.GET.get('min_rating'),
-            'max_rating': self.request.GET.get('max_rating'),
-            'min_reviews': self.request.GET.get('min_reviews'),
-            'max_reviews': self.request.GET.get('max_reviews')
-        }
+        filters = get_search_filters(self.request.GET)
         sort_by = self.request.GET.get('sort_by', 'created_at')
         sort_order = self.request.GET.get('sort_order', 'asc')
 
-        sort_fields = {
-            'created_at': 'created_at',
-            'min_price': 'price',
-            'max_price': '-price',
-            'min_rating': 'average_rating',
-            'max_rating': '-average_rating',
-            'min_reviews': 'reviews_count',
-            'max_reviews': '-reviews_count',
-            'min_views': 'views_count',
-            'max_views': '-views_count'
-        }
-
-        sort_by_field = sort_fields.get(sort_by, 'created_at')
-        if sort_order == 'desc':
-            sort_by_field = '-' + sort_by_field.lstrip('-')
-
-        results = queryset
-
-        # Поиск по ключевым словам в тайтле и описании
-        q_objects = Q()
-        if query:
-            exact_match_results = results.filter(
-                Q(title__icontains=query) | Q(description__icontains=query)
-            )
-            if exact_match_results.exists():
-                results = exact_match_results
-            else:
-                query_words = query.split()
-                for word in query_words:
-                    q_objects |= Q(title__icontains=word) | Q(description__icontains=word)
-                results = results.filter(q_objects)
-
-        # Применение фильтров
-        if filters['min_price']:
-            results = results.filter(price__gte=filters['min_price'])
-        if filters['max_price']:
-            results = results.filter(price__lte=filters['max_price'])
-        if filters['location']:
-            for location in filters['location']:
-                results = results.filter(location__icontains=location)
-        if filters['city']:
-            for city in filters['city']:
-                results = results.filter(city__icontains=city)
-        if filters['country']:
-            results = results.filter(country__icontains=filters['country'])
-        if filters['rooms']:
-            results = results.filter(rooms=filters['rooms'])
-        if filters['property_type']:
-            for property_type in filters['property_type']:
-                results = results.filter(property_type__iexact=property_type)
-        if filters['tags']:
-            for tag in filters['tags']:
-                results = results.filter(tags__name__icontains=tag)
-        if filters['min_views']:
-            results = results.filter(views_count__gte=filters['min_views'])
-        if filters['max_views']:
-            results = results.filter(views_count__lte=filters['max_views'])
-        if filters['min_rating']:
-            results = results.filter(average_rating__gte=filters['min_rating'])
-        if filters['max_rating']:
-            results = results.filter(average_rating__lte=filters['max_rating'])
-        if filters['min_reviews']:
-            results = results.filter(reviews_count__gte=filters['min_reviews'])
-        if filters['max_reviews']:
-            results = results.filter(reviews_count__lte=filters['max_reviews'])
-
-        # Ранжирование результатов
-        when_conditions = []
-        if query:
-            when_conditions.append(When(Q(title__icontains=query) | Q(description__icontains=query), then=1))
-            if not q_objects == Q():
-                when_conditions.append(When(q_objects, then=2))
-
-        results = results.annotate(
-            rank=Case(
-                *when_conditions,
-                default=3,
-                output_field=IntegerField()
-            )
-        ).order_by('rank', sort_by_field)
-
-        return results
+        if not query:
+            results = apply_search_filters(queryset, query, filters)
+            return results.order_by(get_sort_field(sort_by, sort_order), '-id')
+
+        matches = search_rentals(query)
+        results = apply_search_filters(queryset, query, filters, matches)
+        results = rank_by_relevance(results, matches)
+        return results.order_by('-relevance', get_sort_field(sort_by, sort_order), '-id')
+
+    def get_serializer_context(self):
+        """
+        Search results are listed with thumbnails.
+
+        @return: dict : Serializer context with `image_size`
+        """
+        return {**super().get_serializer_context(), 'image_size': 'thumbnail'}
+
+    def list(self, request, *args, **kwargs):
+        """
+        List rentals matching the search query and filters, serving repeated searches from the result cache.
+        Moderators and superusers can pass `explain=1` to get a profile of the search instead of a cached page.
+
+        @param request: Request : The request object containing the search query, filters, sorting and page
+        @param args: tuple : Additional positional arguments
+        @param kwargs: dict : Additional keyword arguments
+
+        @return: Response : Paginated JSON response with the matching rentals
+        """
+        if (request.GET.get('explain') == '1' and request.user.is_authenticated
+                and IsModeratorOrSuperUser().has_permission(request, self)):
+            return self.explain_list(request)
+
+        query = request.GET.get('q', '').strip()
+
+        # Сохраняем поисковый запрос только если он не пустой и пользователь аутентифицирован
+        if query and request.user.is_authenticated:
+            record_search(request.user.id, query)
+
+        if not settings.SEARCH_RESULTS_CACHE_TIMEOUT or not isinstance(self.paginator, PageNumberPagination):
+            return super().list(request, *args, **kwargs)
+
+        params = normalize_search_params(
+            query,
+            get_search_filters(request.GET),
+            sort_by=request.GET.get('sort_by'),
+            sort_order=request.GET.get('sort_order'),
+            page=request.GET.get(self.paginator.page_query_param),
+        )
+        cached = get_cached_search_page(params)
+        if cached is not None:
+            return self.get_cached_page_response(cached['ids'], cached['count'])
+
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        set_cached_search_page(params, [rental.id for rental in page], self.paginator.page.paginator.count)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def explain_list(self, request):
+        """
+        Run the search uncached and attach a profile of it to the normal response: timings of each stage,
+        every SQL statement with its duration and the database EXPLAIN plan of the main query.
+
+        @param request: Request : The request object containing the search query, filters, sorting and page
+
+        @return: Response : Paginated JSON response with the matching rentals and an `explain` section
+        """
+        with SearchProfiler() as profiler:
+            with profiler.stage('queryset'):
+                queryset = self.filter_queryset(self.get_queryset())
+            with profiler.stage('paginate'):
+                page = self.paginate_queryset(queryset)
+            with profiler.stage('serialize'):
+                data = self.get_serializer(page, many=True).data
+            with profiler.stage('explain'):
+                plan = queryset.explain()
+
+        response = self.get_paginated_response(data)
+        response.data['explain'] = profiler.get_report(plan=plan)
+        return response
+
+    def get_cached_page_response(self, rental_ids, count):
+        """
+        Build a paginated response from cached rental IDs without re-running the search or its COUNT query.
+
+        @param rental_ids: list : IDs of the rentals on the requested page, in result order
+        @param count: int : Total number of matching rentals
+
+        @return: Response : Paginated JSON response with the hydrated rentals
+        """
+        paginator = self.paginator
+        django_paginator = paginator.django_paginator_class([], paginator.get_page_size(self.request))
+        django_paginator.count = count
+        page = django_paginator.page(paginator.get_page_number(self.request, django_paginator))
+
+        # Rentals deactivated or unverified since the page was cached are left out
+        rentals = RentalSerializer.setup_eager_loading(
+            Rental.objects.filter(status=True, verified=True)
+        ).in_bulk(rental_ids)
+        page.object_list = [rentals[rental_id] for rental_id in rental_ids if rental_id in rentals]
+        paginator.page = page
+        paginator.request = self.request
+
+        serializer = self.get_serializer(page.object_list, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def popular_searches(self, request):
         """
-        Retrieve the top 10 popular search queries based on search count.
+        Retrieve the top 10 popular search queries of all time or of a recent time window.
 
-        @param request: Request : The request object containing the request data
+        @param request: Request : The request object containing an optional `window`: all, hour, day or week
 
         @return: Response : JSON response with the list of popular search queries and their counts
         """
-        popular_searches = SearchHistory.objects.values('search_query').annotate(
-            total=Sum('search_count')).order_by('-total')[:10]
+        window = request.GET.get('window', 'all')
+        if window not in POPULAR_SEARCH_WINDOWS:
+            return Response({'detail': 'Invalid window parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        popular_searches = get_popular_searches(window, limit=10)
         return Response(popular_searches, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedOrReadOnly])
+    def facets(self, request):
+        """
+        Retrieve per-value counts of property types, cities, countries, tags and price buckets
+        for the current search query and filters.
+
+        @param request: Request : The request object containing the search query and filters
+
+        @return: Response : JSON response with the facet counts
+        """
+        query = request.GET.get('q', '').strip()
+        filters = get_search_filters(request.GET)
+        queryset = Rental.objects.filter(status=True, verified=True)
+        results = apply_search_filters(queryset, query, filters)
+        facets = get_facets(results, normalize_search_params(query, filters))
+        return Response(facets, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export(self, request):
+        """
+        Stream every rental matching the search query and filters as newline-delimited JSON,
+        one serialized rental per line, without pagination.
+
+        @param request: Request : The request object containing the search query and filters
+
+        @return: StreamingHttpResponse : NDJSON stream of the matching rentals in ID order
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = stream_ndjson(
+            queryset, self.get_serializer_class(), self.get_serializer_context(), settings.SEARCH_EXPORT_CHUNK_SIZE)
+
+        response = StreamingHttpResponse(rows, content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="rentals.ndjson"'
+        return response
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedOrReadOnly])
+    def autocomplete(self, request):
+        """
+        Suggest rental titles, cities, countries and popular queries starting with the typed prefix.
+
+        @param request: Request : The request object containing the prefix `q` and an optional `limit`
+
+        @return: Response : JSON response with the list of suggestions, best first
+        """
+        prefix = request.GET.get('q', '')
+        try:
+            limit = int(request.GET.get('limit', 10))
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return Response({'detail': 'Invalid limit parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        suggestions = get_autocomplete_index().search(prefix, limit)
+        return Response(suggestions, status=status.HTTP_200_OK)
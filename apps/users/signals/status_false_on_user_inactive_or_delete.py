@@ -3,16 +3,19 @@ from django.dispatch import receiver
 
 from apps.users.models.user_model import User
 from apps.rentals.models.rental_model import Rental
+from apps.search_and_filters.utils.search_cache_utils import bump_catalog_generation
 
 
 @receiver(post_delete, sender=User)
 def set_rental_status_false_on_user_delete(sender, instance, **kwargs):
     rentals = Rental.objects.filter(user=instance)
-    rentals.update(status=False)
+    if rentals.update(status=False):
+        bump_catalog_generation()
 
 
 @receiver(post_save, sender=User)
 def set_rental_status_false_on_user_inactive(sender, instance, **kwargs):
     if not instance.is_active:
         rentals = Rental.objects.filter(user=instance)
-        rentals.update(status=False)
+        if rentals.update(status=False):
+            bump_catalog_generation()
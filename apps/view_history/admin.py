@@ -1,3 +1,21 @@
 from django.contrib import admin
+from apps.view_history.models.view_rollup_model import RentalViewDaily, RentalViewHourly
 
-# Register your models here.
+
+class RentalViewDailyAdmin(admin.ModelAdmin):
+    list_display = ('rental', 'date', 'views', 'unique_visitors')
+    list_filter = ('date',)
+    search_fields = ('rental__title',)
+    ordering = ('-date', '-views')
+
+
+admin.site.register(RentalViewDaily, RentalViewDailyAdmin)
+
+
+class RentalViewHourlyAdmin(admin.ModelAdmin):
+    list_display = ('rental', 'hour', 'views')
+    search_fields = ('rental__title',)
+    ordering = ('-hour', '-views')
+
+
+admin.site.register(RentalViewHourly, RentalViewHourlyAdmin)
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rentals', '0007_rental_updated_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentalViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+                ('unique_visitors', models.IntegerField(default=0)),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='rentals.rental')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RentalViewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('viewer', models.CharField(max_length=16)),
+                ('viewed_at', models.DateTimeField(db_index=True)),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_events', to='rentals.rental')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RentalViewHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('views', models.IntegerField(default=0)),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_views', to='rentals.rental')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='rentalviewdaily',
+            constraint=models.UniqueConstraint(fields=('rental', 'date'), name='unique_rental_view_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='rentalviewhourly',
+            constraint=models.UniqueConstraint(fields=('rental', 'hour'), name='unique_rental_view_hour'),
+        ),
+    ]
@@ -0,0 +1,2 @@
+from .view_event_model import RentalViewEvent
+from .view_rollup_model import RentalViewHourly, RentalViewDaily
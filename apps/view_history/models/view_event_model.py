@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db import models
+
+from apps.rentals.models.rental_model import Rental
+
+
+class RentalViewEvent(models.Model):
+    """
+    One view of a rental's detail page. Rows are only ever inserted, in batches by flush_view_history.
+    """
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='view_events')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    # Hash of the user ID or, for anonymous viewers, of the IP address (see get_viewer_key)
+    viewer = models.CharField(max_length=16)
+    viewed_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.rental_id} - {self.viewer} - {self.viewed_at}"
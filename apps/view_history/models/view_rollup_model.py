@@ -0,0 +1,34 @@
+from django.db import models
+
+from apps.rentals.models.rental_model import Rental
+
+
+class RentalViewHourly(models.Model):
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='hourly_views')
+    # Start of the hour, UTC
+    hour = models.DateTimeField()
+    views = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rental', 'hour'], name='unique_rental_view_hour'),
+        ]
+
+    def __str__(self):
+        return f"{self.rental_id} - {self.hour} - {self.views}"
+
+
+class RentalViewDaily(models.Model):
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='daily_views')
+    date = models.DateField()
+    views = models.IntegerField(default=0)
+    # HyperLogLog estimate, exact when the day was rolled up from raw events
+    unique_visitors = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rental', 'date'], name='unique_rental_view_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.rental_id} - {self.date} - {self.views}"
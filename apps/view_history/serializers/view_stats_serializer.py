@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from apps.view_history.models.view_rollup_model import RentalViewDaily, RentalViewHourly
+
+
+class RentalViewHourlySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RentalViewHourly
+        fields = ['hour', 'views']
+        read_only_fields = fields
+
+
+class RentalViewDailySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RentalViewDaily
+        fields = ['date', 'views', 'unique_visitors']
+        read_only_fields = fields
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from apps.view_history.views.view_stats_view import RentalViewStatsViewSet
+
+router = DefaultRouter()
+router.register(r'rentals', RentalViewStatsViewSet, basename='rental-view-stats')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
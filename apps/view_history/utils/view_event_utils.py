@@ -0,0 +1,224 @@
+import hashlib
+import json
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.rentals.models.rental_model import Rental
+from apps.view_history.models.view_event_model import RentalViewEvent
+from apps.view_history.models.view_rollup_model import RentalViewDaily, RentalViewHourly
+
+VIEW_EVENTS_KEY = 'view_history:events'
+# Unique viewer HyperLogLogs outlive their day so a late flush can still roll the day up
+UNIQUE_VIEWERS_TTL = int(timedelta(days=8).total_seconds())
+
+
+def get_viewer_key(user, ip_address):
+    viewer = f'user:{user.id}' if user.is_authenticated else f'ip:{ip_address}'
+    return hashlib.blake2b(viewer.encode(), digest_size=8).hexdigest()
+
+
+def get_unique_viewers_key(rental_id, date):
+    return f'view_history:unique:{rental_id}:{date:%Y%m%d}'
+
+
+def get_day_range(date):
+    start = datetime.combine(date, time.min, tzinfo=dt_timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def record_view_event(rental_id, user, ip_address):
+    """
+    Queue a rental view event for the next flush and add the viewer to the rental's unique viewers
+    HyperLogLog for the day.
+
+    Falls back to writing the event immediately when Redis is unavailable.
+
+    @param rental_id: int : ID of the viewed rental
+    @param user: User : User making the request, possibly anonymous
+    @param ip_address: str : Client IP address, identifies anonymous viewers
+
+    @return: None
+    """
+    viewed_at = timezone.now()
+    event = {
+        'rental_id': rental_id,
+        'user_id': user.id if user.is_authenticated else None,
+        'viewer': get_viewer_key(user, ip_address),
+        'viewed_at': viewed_at.isoformat(),
+    }
+    try:
+        unique_viewers_key = get_unique_viewers_key(rental_id, viewed_at.date())
+        pipeline = get_redis_connection('default').pipeline(transaction=False)
+        pipeline.rpush(VIEW_EVENTS_KEY, json.dumps(event))
+        pipeline.pfadd(unique_viewers_key, event['viewer'])
+        pipeline.expire(unique_viewers_key, UNIQUE_VIEWERS_TTL)
+        pipeline.execute()
+    except RedisError:
+        rollup_daily_views(apply_view_events([event]))
+
+
+def pop_view_events(batch_size):
+    pipeline = get_redis_connection('default').pipeline(transaction=True)
+    pipeline.lrange(VIEW_EVENTS_KEY, 0, batch_size - 1)
+    pipeline.ltrim(VIEW_EVENTS_KEY, batch_size, -1)
+    events, _ = pipeline.execute()
+    return [json.loads(event) for event in events]
+
+
+def requeue_view_events(events):
+    # Back at the head of the queue in their original order, for the next flush
+    get_redis_connection('default').lpush(VIEW_EVENTS_KEY, *[json.dumps(event) for event in reversed(events)])
+
+
+def apply_view_events(events):
+    """
+    Insert view events and add them to the hourly rollup.
+
+    @param events: list : Events queued by record_view_event
+
+    @return: set : (rental ID, date) pairs whose daily rollup is out of date
+    """
+    # Rentals and users deleted since the view are dropped rather than failing the batch
+    rental_ids = set(
+        Rental.objects.filter(id__in={event['rental_id'] for event in events}).values_list('id', flat=True))
+    user_ids = set(get_user_model().objects.filter(
+        id__in={event['user_id'] for event in events if event['user_id']}).values_list('id', flat=True))
+
+    view_events = [
+        RentalViewEvent(
+            rental_id=event['rental_id'],
+            user_id=event['user_id'] if event['user_id'] in user_ids else None,
+            viewer=event['viewer'],
+            viewed_at=parse_datetime(event['viewed_at']),
+        )
+        for event in events if event['rental_id'] in rental_ids
+    ]
+    hourly_views = Counter(
+        (view_event.rental_id, view_event.viewed_at.replace(minute=0, second=0, microsecond=0))
+        for view_event in view_events
+    )
+    # One UPDATE per hour and view count instead of one per rental
+    updates = defaultdict(list)
+    for (rental_id, hour), views in hourly_views.items():
+        updates[hour, views].append(rental_id)
+
+    with transaction.atomic():
+        RentalViewEvent.objects.bulk_create(view_events)
+        RentalViewHourly.objects.bulk_create(
+            [RentalViewHourly(rental_id=rental_id, hour=hour, views=0) for rental_id, hour in hourly_views],
+            ignore_conflicts=True,
+        )
+        for (hour, views), ids in updates.items():
+            RentalViewHourly.objects.filter(hour=hour, rental_id__in=ids).update(views=F('views') + views)
+
+    return {(rental_id, hour.date()) for rental_id, hour in hourly_views}
+
+
+def get_unique_visitors(date, rental_ids):
+    """
+    Estimate the unique visitors of rentals on a day from their HyperLogLogs, counting distinct viewers
+    in the raw events for rentals whose HyperLogLog is missing.
+    """
+    unique_visitors = {}
+    try:
+        pipeline = get_redis_connection('default').pipeline(transaction=False)
+        for rental_id in rental_ids:
+            pipeline.pfcount(get_unique_viewers_key(rental_id, date))
+        unique_visitors = {rental_id: count for rental_id, count in zip(rental_ids, pipeline.execute()) if count}
+    except RedisError:
+        pass
+
+    missing = [rental_id for rental_id in rental_ids if rental_id not in unique_visitors]
+    if missing:
+        start, end = get_day_range(date)
+        exact = RentalViewEvent.objects.filter(
+            rental_id__in=missing, viewed_at__gte=start, viewed_at__lt=end
+        ).values('rental_id').annotate(visitors=Count('viewer', distinct=True))
+        unique_visitors.update((row['rental_id'], row['visitors']) for row in exact)
+    return unique_visitors
+
+
+def rollup_daily_views(rental_days):
+    """
+    Recompute the daily rollup rows of the given rentals and days from the hourly rollup
+    and the unique viewer HyperLogLogs.
+
+    @param rental_days: set : (rental ID, date) pairs to recompute
+
+    @return: int : Number of daily rows written
+    """
+    rental_ids_by_date = defaultdict(list)
+    for rental_id, date in rental_days:
+        rental_ids_by_date[date].append(rental_id)
+
+    written = 0
+    for date, rental_ids in rental_ids_by_date.items():
+        start, end = get_day_range(date)
+        views = dict(
+            RentalViewHourly.objects.filter(rental_id__in=rental_ids, hour__gte=start, hour__lt=end)
+            .values('rental_id').annotate(total=Sum('views')).values_list('rental_id', 'total')
+        )
+        unique_visitors = get_unique_visitors(date, list(views))
+        RentalViewDaily.objects.bulk_create(
+            [
+                RentalViewDaily(
+                    rental_id=rental_id, date=date, views=total, unique_visitors=unique_visitors.get(rental_id, 0)
+                )
+                for rental_id, total in views.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['rental', 'date'],
+            update_fields=['views', 'unique_visitors'],
+        )
+        written += len(views)
+    return written
+
+
+def flush_view_history(batch_size=1000):
+    """
+    Write buffered view events to the events table and the hourly rollup, then refresh the daily rollup
+    of every rental and day the events touched.
+
+    @param batch_size: int : Number of events written per transaction
+
+    @return: tuple : Number of events flushed and number of daily rows refreshed
+    """
+    flushed = 0
+    rental_days = set()
+    while True:
+        events = pop_view_events(batch_size)
+        if not events:
+            break
+        try:
+            rental_days |= apply_view_events(events)
+        except DatabaseError:
+            requeue_view_events(events)
+            raise
+        flushed += len(events)
+    return flushed, rollup_daily_views(rental_days)
+
+
+def purge_view_events(retention_days, batch_size=1000):
+    """
+    Delete raw view events older than the retention period, the rollups are kept.
+
+    @param retention_days: int : Days of raw events to keep
+    @param batch_size: int : Number of events deleted per query
+
+    @return: int : Number of events deleted
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        ids = list(RentalViewEvent.objects.filter(viewed_at__lt=cutoff).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += RentalViewEvent.objects.filter(id__in=ids).delete()[0]
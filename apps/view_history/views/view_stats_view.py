@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.rentals.models.rental_model import Rental
+from apps.view_history.models.view_rollup_model import RentalViewDaily, RentalViewHourly
+from apps.view_history.serializers.view_stats_serializer import RentalViewDailySerializer, RentalViewHourlySerializer
+from apps.view_history.utils.view_event_utils import get_day_range
+
+GRANULARITIES = {
+    'day': (RentalViewDaily, RentalViewDailySerializer),
+    'hour': (RentalViewHourly, RentalViewHourlySerializer),
+}
+
+
+class RentalViewStatsViewSet(viewsets.GenericViewSet):
+    """
+    Views and unique visitors of a rental over time, read from the rollups written by the
+    flush_view_history command.
+
+    @queryset: Rental.objects.all() : QuerySet : Rentals whose statistics can be requested
+    @permission_classes: [IsAuthenticated] : List : Permissions required to access the view
+    @lookup_field: 'id' : str : Field used for lookup by viewset
+    """
+    queryset = Rental.objects.all()
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'id'
+
+    def retrieve(self, request, id=None):
+        """
+        Retrieve the view statistics of a rental owned by the user, or of any rental for moderators
+        and superusers.
+
+        @param request: Request : The request object, `granularity` is `day` (default) or `hour`,
+            `start` and `end` are inclusive dates, by default the last VIEW_STATS_DEFAULT_DAYS days
+        @param id: str : ID of the rental property
+
+        @return: Response : JSON response with one entry per day or hour that had views
+
+        @raises: PermissionDenied : If the user does not own the rental and is not a moderator or superuser
+        """
+        rental = self.get_object()
+        user = request.user
+        if not (user.is_superuser or (hasattr(user, 'role') and user.role == 'Moderator') or user == rental.user):
+            raise PermissionDenied("You do not have permission to view the statistics of this rental.")
+
+        granularity = request.GET.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return Response(
+                {'detail': f"Invalid granularity, expected one of: {', '.join(GRANULARITIES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        today = timezone.now().date()
+        try:
+            # parse_date returns None for malformed dates and raises ValueError for impossible ones
+            end = parse_date(request.GET['end']) if request.GET.get('end') else today
+            start = (
+                parse_date(request.GET['start']) if request.GET.get('start')
+                else today - timedelta(days=settings.VIEW_STATS_DEFAULT_DAYS - 1)
+            )
+        except ValueError:
+            start = end = None
+        if not start or not end or start > end:
+            return Response({'detail': 'Invalid date range.'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days >= settings.VIEW_STATS_MAX_DAYS:
+            return Response(
+                {'detail': f'The date range can span at most {settings.VIEW_STATS_MAX_DAYS} days.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        model, serializer_class = GRANULARITIES[granularity]
+        if granularity == 'day':
+            rows = model.objects.filter(rental=rental, date__range=(start, end)).order_by('date')
+        else:
+            rows = model.objects.filter(
+                rental=rental, hour__gte=get_day_range(start)[0], hour__lt=get_day_range(end)[1]
+            ).order_by('hour')
+
+        return Response({
+            'rental': rental.id,
+            'granularity': granularity,
+            'start': start,
+            'end': end,
+            'results': serializer_class(rows, many=True).data,
+        })
@@ -184,3 +184,69 @@ CACHES = {
         }
     }
 }
+
+# Search
+# Seconds to cache facet counts and result pages per normalized search, 0 disables the cache.
+# Cached entries are also invalidated by any rental write through the catalog generation counter.
+
+SEARCH_FACETS_CACHE_TIMEOUT = env.int('SEARCH_FACETS_CACHE_TIMEOUT', 300)
+SEARCH_RESULTS_CACHE_TIMEOUT = env.int('SEARCH_RESULTS_CACHE_TIMEOUT', 120)
+
+# Seconds between rebuilds of each worker's in-memory autocomplete index and the number of
+# popular search queries it includes
+AUTOCOMPLETE_REBUILD_INTERVAL = env.int('AUTOCOMPLETE_REBUILD_INTERVAL', 300)
+AUTOCOMPLETE_MAX_QUERIES = env.int('AUTOCOMPLETE_MAX_QUERIES', 5000)
+
+# Seconds to cache the index statistics (document count, average length and per-term document frequencies)
+# BM25 scores are computed from
+SEARCH_INDEX_STATS_CACHE_TIMEOUT = env.int('SEARCH_INDEX_STATS_CACHE_TIMEOUT', 3600)
+
+# Seconds to cache the merged top queries of a popular searches window, and the number of queries
+# kept in each merged window and in the all-time ranking
+POPULAR_SEARCHES_CACHE_TIMEOUT = env.int('POPULAR_SEARCHES_CACHE_TIMEOUT', 60)
+POPULAR_SEARCHES_TRACKED = env.int('POPULAR_SEARCHES_TRACKED', 10000)
+
+# Directory of the columnar catalog snapshot written by the build_catalog_snapshot command, the largest
+# candidate set it hands to the database (0 disables it) and the age after which it is ignored
+SEARCH_SNAPSHOT_DIR = env.str('SEARCH_SNAPSHOT_DIR', os.path.join(BASE_DIR, 'var', 'search_snapshot'))
+SEARCH_SNAPSHOT_MAX_CANDIDATES = env.int('SEARCH_SNAPSHOT_MAX_CANDIDATES', 5000)
+SEARCH_SNAPSHOT_MAX_AGE = env.int('SEARCH_SNAPSHOT_MAX_AGE', 3600)
+
+# Rentals read and serialized per query by the streaming search export
+SEARCH_EXPORT_CHUNK_SIZE = env.int('SEARCH_EXPORT_CHUNK_SIZE', 500)
+
+# Rentals
+# Neighbor table written by the build_similar_rentals command and read by the `similar` rental action
+
+SIMILAR_RENTALS_PATH = env.str('SIMILAR_RENTALS_PATH', os.path.join(BASE_DIR, 'var', 'similar_rentals.npz'))
+
+# Processes resizing uploaded rental images into thumbnails, medium sizes and WebP after the upload
+# has committed. 0 resizes in the request itself, for development and tests
+IMAGE_DERIVATIVE_WORKERS = env.int('IMAGE_DERIVATIVE_WORKERS', 2)
+
+# Uploads are hashed while they stream in, rental images are stored once per content under that hash
+FILE_UPLOAD_HANDLERS = [
+    'apps.core.utils.upload_utils.HashingMemoryFileUploadHandler',
+    'apps.core.utils.upload_utils.HashingTemporaryFileUploadHandler',
+]
+
+# Age in seconds after which a rental image file no image references is removed by sweep_media_files --orphans
+MEDIA_ORPHAN_GRACE_SECONDS = env.int('MEDIA_ORPHAN_GRACE_SECONDS', 86400)
+
+# Bulk rental import (import_rentals command and the admin import endpoint): directory the rows' image paths
+# are relative to, rows inserted per transaction and failed rows reported per import
+RENTAL_IMPORT_IMAGES_DIR = env.str('RENTAL_IMPORT_IMAGES_DIR', os.path.join(BASE_DIR, 'var', 'rental_import'))
+RENTAL_IMPORT_BATCH_SIZE = env.int('RENTAL_IMPORT_BATCH_SIZE', 500)
+RENTAL_IMPORT_MAX_ERRORS = env.int('RENTAL_IMPORT_MAX_ERRORS', 1000)
+
+# Seconds during which repeated views of a rental by the same user or IP address count once.
+# Views are counted in Redis and written to the database by the flush_rental_views command
+RENTAL_VIEW_DEDUP_SECONDS = env.int('RENTAL_VIEW_DEDUP_SECONDS', 10)
+
+# View history
+# Days of raw view events kept by the flush_view_history command (rollups are kept), and the default
+# and longest date range of the rental view statistics endpoint
+
+VIEW_EVENTS_RETENTION_DAYS = env.int('VIEW_EVENTS_RETENTION_DAYS', 90)
+VIEW_STATS_DEFAULT_DAYS = env.int('VIEW_STATS_DEFAULT_DAYS', 30)
+VIEW_STATS_MAX_DAYS = env.int('VIEW_STATS_MAX_DAYS', 366)